@@ -0,0 +1,88 @@
+import asyncio
+import time
+import numpy as np
+
+class MicroBatcher:
+    """
+    Collects single-row prediction requests arriving within `window`
+    seconds (up to `max_batch` rows) and scores them with one predict_proba
+    call on `executor`. At most `max_in_flight` batches are scored at once.
+    `get_entry` returns the registry entry ({'model', 'version'}) to score
+    each batch with. `on_batch`, if given, is called after each batch with
+    its size, each request's seconds in the queue and the inference seconds.
+    """
+    def __init__(self, get_entry, executor, window=0.002, max_batch=64, max_in_flight=4, on_batch=None):
+        self.get_entry = get_entry
+        self.on_batch = on_batch
+        self.executor = executor
+        self.window = window
+        self.max_batch = max_batch
+        self.max_in_flight = max_in_flight
+        self.queue = None
+        self.slots = None
+        self.task = None
+
+    def start(self):
+        self.queue = asyncio.Queue()
+        self.slots = asyncio.Semaphore(self.max_in_flight)
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+
+    async def predict(self, row):
+        """
+        Probabilities for one float32 feature row, and the model version
+        that produced them.
+        """
+        # Started lazily when used outside the app's lifespan (or a new loop)
+        if self.task is None or self.task.done() or self.task.get_loop() is not asyncio.get_running_loop():
+            self.start()
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((row, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        batch = [await self.queue.get()]
+        deadline = loop.time() + self.window
+        while len(batch) < self.max_batch:
+            if not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            await self.slots.acquire()
+            asyncio.create_task(self._score(batch))
+
+    async def _score(self, batch):
+        futures = [future for _, future, _ in batch]
+        try:
+            entry = self.get_entry()
+            X = np.stack([row for row, _, _ in batch])
+            start = time.perf_counter()
+            probs = await asyncio.get_running_loop().run_in_executor(self.executor, entry['model'].predict_proba, X)
+            end = time.perf_counter()
+            for future, p in zip(futures, probs):
+                if not future.done():
+                    future.set_result((p, entry['version']))
+            if self.on_batch is not None:
+                self.on_batch(len(batch), [start - enqueued for _, _, enqueued in batch], end - start)
+        except Exception as exc:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(exc)
+        finally:
+            self.slots.release()
@@ -0,0 +1,87 @@
+import argparse
+import asyncio
+import time
+import httpx
+import numpy as np
+from src.models.group_stage import AFCON_2025_GROUPS
+
+# Teams the /predict/{home}/{away} requests are drawn from
+TEAMS = [team for group in AFCON_2025_GROUPS.values() for team in group]
+
+MATCH = {
+    'home_rank': 30, 'away_rank': 50, 'home_points': 1500.0, 'away_points': 1400.0,
+    'home_form': 2.0, 'away_form': 1.0, 'home_goal_diff_form': 1.0, 'away_goal_diff_form': 0.0,
+    'rank_diff': -20, 'point_diff': 100.0, 'home_rank_momentum': 0, 'away_rank_momentum': 0,
+    'h2h_win_rate': 0.5, 'h2h_game_count': 3, 'is_home_adv': 0, 'is_neutral': 1
+}
+
+def make_request(endpoint, rng, batch_rows):
+    """
+    (method, url, json body) of one request to `endpoint`.
+    """
+    if endpoint == 'pair':
+        home, away = rng.choice(TEAMS, size=2, replace=False)
+        return 'GET', f"/predict/{home}/{away}", None
+    if endpoint == 'predict':
+        home, away = rng.choice(TEAMS, size=2, replace=False)
+        return 'POST', "/predict", {**MATCH, 'home_team': home, 'away_team': away}
+    return 'POST', "/predict/batch", {'columns': {
+        'home_elo': rng.normal(1500, 150, batch_rows).tolist(),
+        'away_elo': rng.normal(1500, 150, batch_rows).tolist()
+    }}
+
+async def run_level(client, endpoint, concurrency, n_requests, rng, batch_rows):
+    """
+    Sends n_requests from `concurrency` concurrent clients. Returns the
+    per-request latencies in seconds, the wall time and the error count.
+    """
+    requests = [make_request(endpoint, rng, batch_rows) for _ in range(n_requests)]
+    latencies = []
+    errors = 0
+
+    async def client_loop(worker):
+        nonlocal errors
+        for method, url, body in requests[worker::concurrency]:
+            start = time.perf_counter()
+            response = await client.request(method, url, json=body)
+            latencies.append(time.perf_counter() - start)
+            errors += response.status_code != 200
+
+    start = time.perf_counter()
+    await asyncio.gather(*[client_loop(k) for k in range(concurrency)])
+    return np.array(latencies), time.perf_counter() - start, errors
+
+async def run(args):
+    # Imported here so the app picks up settings from the environment
+    from api import main
+
+    rng = np.random.default_rng(args.seed)
+    async with main.lifespan(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadgen") as client:
+            await run_level(client, args.endpoint, 1, args.warmup, rng, args.batch_rows)
+
+            print(f"{args.endpoint}: {args.requests} requests per level")
+            print(f"{'concurrency':>11} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>6}")
+            for concurrency in args.concurrency:
+                latencies, elapsed, errors = await run_level(client, args.endpoint, concurrency, args.requests, rng, args.batch_rows)
+                p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+                print(f"{concurrency:>11} {len(latencies) / elapsed:>9.0f} {p50:>8.3f} {p95:>8.3f} {p99:>8.3f} {errors:>6}")
+
+            if args.metrics:
+                print((await client.get("/metrics")).text)
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the predictor API in-process and report latency percentiles.")
+    parser.add_argument('--endpoint', choices=['pair', 'predict', 'batch'], default='pair',
+                        help="pair: GET /predict/{home}/{away}, predict: POST /predict, batch: POST /predict/batch")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32, 128], help="Concurrency levels to run")
+    parser.add_argument('--requests', type=int, default=2000, help="Requests per concurrency level")
+    parser.add_argument('--warmup', type=int, default=200, help="Requests sent before measuring")
+    parser.add_argument('--batch-rows', type=int, default=100, help="Matches per /predict/batch request")
+    parser.add_argument('--metrics', action='store_true', help="Print the /metrics output at the end")
+    parser.add_argument('--seed', type=int, default=0)
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
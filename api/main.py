@@ -1,14 +1,161 @@
-from fastapi import FastAPI
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel, Field
+from typing import Annotated, Dict, List, Optional
+from functools import lru_cache
+from contextlib import asynccontextmanager
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import argparse
+import os
+import threading
+import time
 import pandas as pd
-import pickle
-from src.config import XGB_MODEL_PATH
+import numpy as np
+from src.config import INFERENCE_BACKEND, TEAM_STORE_PATH
+from src.features.team_store import load_team_store, get_team_state
+from src.features.context_features import TOURNAMENT_WEIGHTS, DEFAULT_TOURNAMENT_WEIGHT
+from src.models.matchups import MATCH_FEATURES, pair_features
+from src.models.registry import get_entry, refresh_models
+from src.utils.team_name_map import normalize_team_name
+from api.batching import MicroBatcher
+from api import metrics
 
-app = FastAPI(title="AFCON 2025 Predictor API")
+# Largest number of matches accepted by /predict/batch
+MAX_BATCH_ROWS = 10_000
 
-# Load model at startup
-with open(XGB_MODEL_PATH, 'rb') as f:
-    model = pickle.load(f)
+# Largest /predict/batch body, declared or streamed
+MAX_BATCH_BYTES = 32 * 1024 * 1024
+
+# Matchups kept in the /predict/{home}/{away} cache
+PAIR_CACHE_SIZE = 4096
+
+# Seconds between checks of the model artifact for a retrain
+MODEL_POLL_SECONDS = 5
+
+# Micro-batching of single predictions: requests arriving within the window
+# are scored together, in a bounded pool of inference threads. Set from the
+# command line (see main) through the environment, so every worker sees them.
+BATCH_WINDOW_MS = float(os.environ.get("AFCON_BATCH_WINDOW_MS", 2))
+MAX_MICRO_BATCH = int(os.environ.get("AFCON_MAX_MICRO_BATCH", 64))
+INFERENCE_THREADS = int(os.environ.get("AFCON_INFERENCE_THREADS", 4))
+
+def current_model():
+    # Requests take the registry's current entry, so a reload swaps models
+    # without affecting requests already in flight
+    return get_entry('xgb', backend=INFERENCE_BACKEND)
+
+def observe_stage(stage, start):
+    # Seconds since `start` (a perf_counter reading) spent in a request stage
+    metrics.observe('afcon_stage_seconds', time.perf_counter() - start, stage=stage)
+
+def record_batch(size, queue_seconds, inference_seconds):
+    metrics.observe('afcon_batch_size', size, source='micro')
+    for seconds in queue_seconds:
+        metrics.observe('afcon_stage_seconds', seconds, stage='queue')
+    metrics.observe('afcon_stage_seconds', inference_seconds, stage='inference')
+
+executor = ThreadPoolExecutor(max_workers=INFERENCE_THREADS, thread_name_prefix="inference")
+batcher = MicroBatcher(current_model, executor, window=BATCH_WINDOW_MS / 1000,
+                       max_batch=MAX_MICRO_BATCH, max_in_flight=INFERENCE_THREADS,
+                       on_batch=record_batch)
+
+# (model version, home, away, context) -> probabilities, least recent first
+pair_cache = OrderedDict()
+pair_cache_lock = threading.Lock()
+
+def _store_stat():
+    st = os.stat(TEAM_STORE_PATH)
+    return (st.st_mtime_ns, st.st_size)
+
+def reload_team_store():
+    # Re-reads the team store if a pipeline run rewrote it
+    global team_store, team_store_stat
+    stat = _store_stat()
+    if stat == team_store_stat:
+        return False
+    team_store, team_store_stat = load_team_store(), stat
+    return True
+
+def reload_models():
+    reloaded = refresh_models()
+    if reload_team_store():
+        # Matchup rows were built from the previous team states
+        pair_row.cache_clear()
+        reloaded.append('team_store')
+    if reloaded:
+        # Entries of the previous model or team states can no longer be hit
+        with pair_cache_lock:
+            pair_cache.clear()
+    return reloaded
+
+def poll_models(stop):
+    while not stop.wait(MODEL_POLL_SECONDS):
+        reload_models()
+
+def warmup():
+    # Load and export the model and run every inference path once, so the
+    # first requests don't pay for it
+    model = current_model()['model']
+    row = np.zeros((1, len(MATCH_FEATURES)), dtype=np.float32)
+    model.predict_proba(row)
+    model.predict_proba(np.repeat(row, MAX_MICRO_BATCH, axis=0))
+
+@asynccontextmanager
+async def lifespan(app):
+    warmup()
+    batcher.start()
+    stop = threading.Event()
+    threading.Thread(target=poll_models, args=(stop,), daemon=True).start()
+    yield
+    stop.set()
+    await batcher.stop()
+
+app = FastAPI(title="AFCON 2025 Predictor API", lifespan=lifespan)
+
+class BodySizeLimit:
+    """
+    ASGI middleware limiting the request body on `path` to `max_bytes`. A
+    larger Content-Length fails with 413 before the body is read; a body
+    without one (e.g. chunked) is counted as it arrives and fails with 413
+    once it passes the limit, before it is parsed.
+    """
+    def __init__(self, app, path, max_bytes):
+        self.app = app
+        self.path = path
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['path'] != self.path:
+            return await self.app(scope, receive, send)
+
+        length = dict(scope['headers']).get(b'content-length', b'')
+        declared = length.isdigit()
+        received = int(length) if declared else 0
+
+        async def limited_receive():
+            nonlocal received
+            if received <= self.max_bytes:
+                message = await receive()
+                if not declared:
+                    received += len(message.get('body', b''))
+            if received > self.max_bytes:
+                # Raised while the endpoint reads its body, so FastAPI
+                # answers it like any HTTPException
+                raise HTTPException(status_code=413, detail=f"Body exceeds the limit of {self.max_bytes} bytes")
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+app.add_middleware(BodySizeLimit, path="/predict/batch", max_bytes=MAX_BATCH_BYTES)
+
+# Added last so it is outermost and records every response
+app.add_middleware(metrics.MetricsMiddleware)
+
+# Latest state per team, one row per team, and the file stat it was read at
+team_store_stat = _store_stat()
+team_store = load_team_store()
 
 class MatchInput(BaseModel):
     home_rank: int
@@ -27,21 +174,205 @@ class MatchInput(BaseModel):
     h2h_game_count: int
     is_home_adv: int
     is_neutral: int
+    # The model's other features are taken from these teams' stored state
+    home_team: Optional[str] = None
+    away_team: Optional[str] = None
+    tournament: str = 'African Cup of Nations'
+
+class BatchInput(BaseModel):
+    # Either one feature dict per match, or one array per feature, of at
+    # most MAX_BATCH_ROWS matches
+    matches: Optional[Annotated[List[Dict[str, float]], Field(max_length=MAX_BATCH_ROWS)]] = None
+    columns: Optional[Dict[str, Annotated[List[float], Field(max_length=MAX_BATCH_ROWS)]]] = None
+
+def pack_batch(batch):
+    """
+    Packs a batch into a float32 matrix in MATCH_FEATURES order. Features
+    left out of the batch are NaN, which the model treats as missing.
+    """
+    if (batch.matches is None) == (batch.columns is None):
+        raise HTTPException(status_code=422, detail="Provide exactly one of 'matches' or 'columns'")
+
+    if batch.columns is not None:
+        lengths = {len(values) for values in batch.columns.values()}
+        if len(lengths) > 1:
+            raise HTTPException(status_code=422, detail="All columns must have the same length")
+        names = set(batch.columns)
+        n = lengths.pop() if lengths else 0
+    else:
+        names = set().union(*batch.matches)
+        n = len(batch.matches)
+
+    unknown = names.difference(MATCH_FEATURES)
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown features: {sorted(unknown)}")
+
+    X = np.full((n, len(MATCH_FEATURES)), np.nan, dtype=np.float32)
+    for k, name in enumerate(MATCH_FEATURES):
+        if batch.columns is not None:
+            if name in batch.columns:
+                X[:, k] = batch.columns[name]
+        elif name in names:
+            X[:, k] = [match.get(name, np.nan) for match in batch.matches]
+    return X
 
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the AFCON 2025 Predictor API"}
 
+def resolve_team(name):
+    # Normalized name of a team in the store (e.g. Congo DR -> DR Congo)
+    team = normalize_team_name(name)
+    if team not in team_store.index:
+        raise HTTPException(status_code=404, detail=f"Unknown team: {team}")
+    return team
+
+@app.get("/teams/{team}")
+def team_state(team: str):
+    state = get_team_state(team_store, resolve_team(team))
+    return {field: (None if pd.isna(value) else float(value)) for field, value in state.items()}
+
+def observe_validation(request):
+    # Routing, body parsing and pydantic validation all happen before the
+    # handler runs
+    observe_stage('validation', request.state.request_start)
+
 @app.post("/predict")
-def predict(match: MatchInput):
-    df = pd.DataFrame([match.dict()])
-    probs = model.predict_proba(df)[0]
+async def predict(match: MatchInput, request: Request):
+    observe_validation(request)
+    if match.home_team is None or match.away_team is None:
+        missing = [name for name in MATCH_FEATURES if name not in MatchInput.model_fields]
+        raise HTTPException(status_code=422, detail=(
+            f"The model also needs {missing}; pass home_team and away_team to fill them "
+            "from the team store, or use /predict/{home}/{away}"))
+
+    start = time.perf_counter()
+    home, away = resolve_team(match.home_team), resolve_team(match.away_team)
+    # Stored matchup features, overridden by the ones given
+    row = pair_row(home, away, bool(match.is_neutral), home if match.is_home_adv else None, match.tournament).copy()
+    values = match.dict()
+    for k, name in enumerate(MATCH_FEATURES):
+        if name in values:
+            row[k] = values[name]
+    observe_stage('features', start)
+    probs, _ = await batcher.predict(row)
     return {
         "home_win_prob": float(probs[0]),
         "draw_prob": float(probs[1]),
         "away_win_prob": float(probs[2])
     }
 
-if __name__ == "__main__":
+@lru_cache(maxsize=PAIR_CACHE_SIZE)
+def pair_row(home, away, neutral, venue_country, tournament):
+    """
+    Feature row of a matchup from both teams' stored state.
+    """
+    home_state = get_team_state(team_store, home)
+    away_state = get_team_state(team_store, away)
+
+    context = {
+        'is_neutral': int(neutral),
+        'is_home_adv': int(venue_country == home),
+        'tournament_weight': TOURNAMENT_WEIGHTS.get(tournament, DEFAULT_TOURNAMENT_WEIGHT)
+    }
+    X = pair_features(
+        {field: np.array([value], dtype=float) for field, value in home_state.items()},
+        {field: np.array([value], dtype=float) for field, value in away_state.items()},
+        context
+    )
+    return X[0].astype(np.float32)
+
+async def predict_pair(home, away, neutral, venue_country, tournament):
+    """
+    Outcome probabilities for a matchup and the model version used,
+    memoized per (model version, teams, match context).
+    """
+    context = (neutral, venue_country, tournament)
+    key = (current_model()['version'], home, away, context)
+    with pair_cache_lock:
+        if key in pair_cache:
+            pair_cache.move_to_end(key)
+            metrics.inc('afcon_pair_cache_total', result='hit')
+            return pair_cache[key], key[0]
+    metrics.inc('afcon_pair_cache_total', result='miss')
+
+    start = time.perf_counter()
+    row = pair_row(home, away, *context)
+    observe_stage('features', start)
+    probs, version = await batcher.predict(row)
+    probs = tuple(float(p) for p in probs)
+    with pair_cache_lock:
+        pair_cache[(version, home, away, context)] = probs
+        if len(pair_cache) > PAIR_CACHE_SIZE:
+            pair_cache.popitem(last=False)
+    return probs, version
+
+@app.get("/predict/{home}/{away}")
+async def predict_teams(request: Request, home: str, away: str, neutral: bool = True, venue_country: Optional[str] = None,
+                  tournament: str = 'African Cup of Nations'):
+    observe_validation(request)
+    home, away = resolve_team(home), resolve_team(away)
+
+    venue_country = normalize_team_name(venue_country) if venue_country else None
+    (home_win, draw, away_win), version = await predict_pair(home, away, neutral, venue_country, tournament)
+    return {
+        "home_team": home,
+        "away_team": away,
+        "model_version": version,
+        "home_win_prob": home_win,
+        "draw_prob": draw,
+        "away_win_prob": away_win
+    }
+
+@app.post("/predict/batch")
+async def predict_batch(batch: BatchInput, request: Request):
+    observe_validation(request)
+    start = time.perf_counter()
+    X = pack_batch(batch)
+    observe_stage('features', start)
+    if len(X) == 0:
+        return {"home_win_prob": [], "draw_prob": [], "away_win_prob": []}
+
+    # One predict_proba call for the whole batch, off the event loop
+    model = current_model()['model']
+    start = time.perf_counter()
+    probs = await asyncio.get_running_loop().run_in_executor(executor, model.predict_proba, X)
+    observe_stage('inference', start)
+    metrics.observe('afcon_batch_size', len(X), source='batch')
+    return {
+        "home_win_prob": probs[:, 0].tolist(),
+        "draw_prob": probs[:, 1].tolist(),
+        "away_win_prob": probs[:, 2].tolist()
+    }
+
+@app.post("/models/reload")
+def reload():
+    reloaded = reload_models()
+    return {"reloaded": reloaded, "xgb_version": current_model()['version']}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def read_metrics():
+    entry = current_model()
+    metrics.set_info('afcon_model_info', model='xgb', version=entry['version'], backend=INFERENCE_BACKEND)
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the AFCON predictor API.")
+    parser.add_argument('--host', default="0.0.0.0")
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=1, help="Number of uvicorn worker processes")
+    parser.add_argument('--batch-window-ms', type=float, default=BATCH_WINDOW_MS, help="Micro-batching window for single predictions")
+    parser.add_argument('--max-batch', type=int, default=MAX_MICRO_BATCH, help="Largest micro-batch")
+    parser.add_argument('--inference-threads', type=int, default=INFERENCE_THREADS, help="Inference threads per worker")
+    args = parser.parse_args()
+
+    # Workers import the app afresh, so settings travel through the environment
+    os.environ["AFCON_BATCH_WINDOW_MS"] = str(args.batch_window_ms)
+    os.environ["AFCON_MAX_MICRO_BATCH"] = str(args.max_batch)
+    os.environ["AFCON_INFERENCE_THREADS"] = str(args.inference_threads)
+
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run("api.main:app", host=args.host, port=args.port, workers=args.workers)
+
+if __name__ == "__main__":
+    main()
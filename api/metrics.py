@@ -0,0 +1,122 @@
+import bisect
+import threading
+import time
+
+# Latency buckets in seconds, from 50us to 5s
+LATENCY_BUCKETS = [0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0]
+
+# Batch size buckets, up to the /predict/batch limit
+BATCH_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128, 256, 1024, 4096, 10000]
+
+_lock = threading.Lock()
+
+# name -> {'type', 'help', 'buckets', 'series': {labels: value or [bucket counts, sum, count]}}
+_metrics = {}
+
+def _register(name, kind, help_text, buckets=None):
+    _metrics[name] = {'type': kind, 'help': help_text, 'buckets': buckets, 'series': {}}
+
+_register('afcon_requests_total', 'counter', "Requests served, by route and status code")
+_register('afcon_request_seconds', 'histogram', "End-to-end request latency", LATENCY_BUCKETS)
+_register('afcon_stage_seconds', 'histogram', "Time spent per request stage", LATENCY_BUCKETS)
+_register('afcon_batch_size', 'histogram', "Rows per predict_proba call", BATCH_BUCKETS)
+_register('afcon_pair_cache_total', 'counter', "Team-name prediction cache lookups, by result")
+_register('afcon_model_info', 'gauge', "Model currently served (value is always 1)")
+
+def _labels(labels):
+    return tuple(sorted(labels.items()))
+
+def inc(name, amount=1, **labels):
+    key = _labels(labels)
+    with _lock:
+        series = _metrics[name]['series']
+        series[key] = series.get(key, 0) + amount
+
+def set_gauge(name, value, **labels):
+    with _lock:
+        _metrics[name]['series'][_labels(labels)] = value
+
+def set_info(name, **labels):
+    """
+    Sets an info-style gauge to 1 for `labels`, dropping previous label sets.
+    """
+    with _lock:
+        _metrics[name]['series'] = {_labels(labels): 1}
+
+def observe(name, value, **labels):
+    metric = _metrics[name]
+    key = _labels(labels)
+    k = bisect.bisect_left(metric['buckets'], value)
+    with _lock:
+        series = metric['series'].get(key)
+        if series is None:
+            series = metric['series'][key] = [[0] * len(metric['buckets']), 0.0, 0]
+        if k < len(metric['buckets']):
+            series[0][k] += 1
+        series[1] += value
+        series[2] += 1
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{v}"' for k, v in pairs) + '}'
+
+def render():
+    """
+    All metrics in the Prometheus text exposition format.
+    """
+    lines = []
+    with _lock:
+        for name, metric in _metrics.items():
+            lines.append(f"# HELP {name} {metric['help']}")
+            lines.append(f"# TYPE {name} {metric['type']}")
+            for key, value in metric['series'].items():
+                if metric['type'] != 'histogram':
+                    lines.append(f"{name}{_format_labels(key)} {value}")
+                    continue
+                bucket_counts, total, count = value
+                cumulative = 0
+                for bound, n in zip(metric['buckets'], bucket_counts):
+                    cumulative += n
+                    lines.append(f"{name}_bucket{_format_labels(key, [('le', bound)])} {cumulative}")
+                lines.append(f"{name}_bucket{_format_labels(key, [('le', '+Inf')])} {count}")
+                lines.append(f"{name}_sum{_format_labels(key)} {total}")
+                lines.append(f"{name}_count{_format_labels(key)} {count}")
+    return '\n'.join(lines) + '\n'
+
+def reset():
+    with _lock:
+        for metric in _metrics.values():
+            metric['series'].clear()
+
+class MetricsMiddleware:
+    """
+    ASGI middleware counting requests and timing them by route template and
+    status code. The request's start time is left in scope['state'] under
+    'request_start', for handlers timing their own stages.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        scope.setdefault('state', {})['request_start'] = start
+        status = [500]
+
+        async def send_with_status(message):
+            if message['type'] == 'http.response.start':
+                status[0] = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # Route templates keep the label set bounded (no raw team names)
+            route = scope.get('route')
+            path = route.path if route is not None else 'unmatched'
+            inc('afcon_requests_total', route=path, status=status[0])
+            observe('afcon_request_seconds', time.perf_counter() - start, route=path)
@@ -1,57 +1,127 @@
 import sys
 import os
+import argparse
 
 # Add src to path
 sys.path.append(os.path.abspath('.'))
 
-from src.data.clean_matches import clean_matches
-from src.data.clean_fifa import clean_fifa_rankings
-from src.data.clean_goals import clean_goals
-from src.data.merge_fifa import merge_fifa_rankings
-from src.features.form_features import calculate_form
-from src.features.h2h_features import calculate_h2h
-from src.features.fifa_features import calculate_fifa_features
-from src.features.context_features import calculate_context_features
-from src.features.elo_features import calculate_elo
-from src.features.travel_features import calculate_travel_distance
-from src.features.squad_features import calculate_squad_features
-from src.models.train import train_model
-from src.models.train_baseline import train_baseline
-from src.models.evaluate import compare_models
-from src.config import FEATURES_TABLE
-
-def run_pipeline():
-    print("--- Starting Pipeline ---")
-    
-    print("1. Cleaning data...")
-    clean_matches()
-    clean_fifa_rankings()
-    clean_goals()
-    
-    print("2. Merging datasets...")
-    df = merge_fifa_rankings()
-    
-    print("3. Engineering features...")
-    df = calculate_form(df)
-    df = calculate_h2h(df)
-    df = calculate_fifa_features(df)
-    df = calculate_context_features(df)
-    df = calculate_elo(df)
-    df = calculate_travel_distance(df)
-    df = calculate_squad_features(df)
-    
+import pandas as pd
+from functools import partial
+from src.data import clean_matches, clean_fifa, clean_goals, merge_fifa, storage
+from src.data.storage import load_table, save_table
+from src.features import form_features, h2h_features, fifa_features, context_features
+from src.features import elo_features, travel_features, squad_features, team_store, schema
+from src.models import train, train_baseline, evaluate, goal_model, registry, tree_backend
+from src.utils import constants, team_name_map, geo_data
+from src.utils.dag import stage, run_dag
+from src.config import (
+    MATCHES_RAW, FIFA_RANKING_RAW, GOALS_RAW, SQUAD_VALUES_RAW,
+    MATCHES_CLEANED, FIFA_CLEANED, GOALS_CLEANED, MERGED_TABLE, FEATURE_PARTS_DIR,
+    FEATURES_TABLE, FEATURE_MATRIX_PATH, LABELS_PATH, MATCH_DATES_PATH, MATCH_ROWS_PATH, FEATURE_MATRIX_META_PATH,
+    TEAM_STORE_PATH, ELO_STATE_PATH, XGB_MODEL_PATH, BASELINE_MODEL_PATH, SCALER_PATH, GOAL_MODEL_PATH,
+    PIPELINE_CACHE_PATH
+)
+
+# Feature families in the column order of the final feature table
+FEATURE_PARTS = ['form', 'h2h', 'fifa', 'context', 'elo', 'travel', 'squad']
+
+def _part_path(name):
+    return FEATURE_PARTS_DIR / f"{name}.parquet"
+
+def _save_feature_part(df, base_columns, name):
+    # Keep only the columns this family added, in the merged table's row order
+    new_columns = [col for col in df.columns if col not in base_columns]
+    save_table(df[new_columns].sort_index(), _part_path(name))
+
+def merge_stage():
+    save_table(merge_fifa.merge_fifa_rankings(), MERGED_TABLE)
+
+def feature_stage(name, calculate):
+    df = load_table(MERGED_TABLE, categorical=False)
+    _save_feature_part(calculate(df.copy()), df.columns, name)
+
+def elo_stage():
+    df = load_table(MERGED_TABLE, categorical=False)
+    base_columns = df.columns
+    # K-factors depend on the tournament weight from the context features
+    df = df.join(load_table(_part_path('context'), columns=['tournament_weight']))
+    df, elo_state = elo_features.run_elo(df)
+    elo_features.save_elo_state(elo_state, ELO_STATE_PATH)
+    _save_feature_part(df.drop(columns='tournament_weight'), base_columns, 'elo')
+
+def squad_stage():
+    feature_stage('squad', lambda df: squad_features.calculate_squad_features(df, SQUAD_VALUES_RAW))
+
+def assemble_stage():
+    df = load_table(MERGED_TABLE, categorical=False)
+    parts = [load_table(_part_path(name), categorical=False) for name in FEATURE_PARTS]
+    df = pd.concat([df] + parts, axis=1)
+
     # Save features
-    df.to_csv(FEATURES_TABLE, index=False)
+    save_table(df, FEATURES_TABLE)
     print(f"Features saved to {FEATURES_TABLE}")
-    
-    print("4. Training models...")
-    train_baseline()
-    train_model()
-    
-    print("5. Evaluating and comparing models...")
-    compare_models()
-    
-    print("--- Pipeline Completed Successfully ---")
+
+# Arrays of the feature matrix, as written by schema.build_feature_matrix
+FEATURE_MATRIX_FILES = [FEATURE_MATRIX_PATH, LABELS_PATH, MATCH_DATES_PATH, MATCH_ROWS_PATH, FEATURE_MATRIX_META_PATH]
+
+def build_stages():
+    # Stage functions of this module that write the feature parts
+    part_code = [feature_stage, _save_feature_part, _part_path]
+    # Modules the training and evaluation stages load data and models through
+    model_code = [schema, storage, registry, tree_backend]
+
+    feature_families = [
+        ('form', form_features.calculate_form, [form_features, constants]),
+        ('h2h', h2h_features.calculate_h2h, [h2h_features]),
+        ('fifa', fifa_features.calculate_fifa_features, [fifa_features]),
+        ('context', context_features.calculate_context_features, [context_features]),
+        ('travel', travel_features.calculate_travel_distance, [travel_features, geo_data])
+    ]
+
+    stages = [
+        stage('clean_matches', clean_matches.clean_matches, [MATCHES_RAW], [MATCHES_CLEANED], code=[clean_matches, constants, team_name_map, storage]),
+        stage('clean_fifa', clean_fifa.clean_fifa_rankings, [FIFA_RANKING_RAW], [FIFA_CLEANED], code=[clean_fifa, team_name_map, storage]),
+        stage('clean_goals', clean_goals.clean_goals, [GOALS_RAW], [GOALS_CLEANED], code=[clean_goals, storage]),
+        stage('merge', merge_stage, [MATCHES_CLEANED, FIFA_CLEANED], [MERGED_TABLE], code=[merge_stage, merge_fifa, team_name_map, storage])
+    ]
+
+    for name, calculate, code in feature_families:
+        stages.append(stage(f'features_{name}', partial(feature_stage, name, calculate), [MERGED_TABLE], [_part_path(name)], code=code + part_code))
+
+    stages += [
+        stage('features_elo', elo_stage, [MERGED_TABLE, _part_path('context')], [_part_path('elo'), ELO_STATE_PATH], code=[elo_stage, elo_features] + part_code),
+        stage('features_squad', squad_stage, [MERGED_TABLE, SQUAD_VALUES_RAW], [_part_path('squad')], code=[squad_stage, squad_features] + part_code),
+        stage('features', assemble_stage, [MERGED_TABLE] + [_part_path(name) for name in FEATURE_PARTS], [FEATURES_TABLE], code=[assemble_stage, _part_path, storage]),
+        stage('team_store', team_store.materialize_team_store, [FEATURES_TABLE], [TEAM_STORE_PATH], code=[team_store, form_features, elo_features, context_features, constants, storage]),
+        stage('feature_matrix', schema.build_feature_matrix, [FEATURES_TABLE], FEATURE_MATRIX_FILES, code=[schema, storage]),
+        stage('train_baseline', train_baseline.train_baseline, FEATURE_MATRIX_FILES, [BASELINE_MODEL_PATH, SCALER_PATH], code=[train_baseline] + model_code),
+        stage('train', train.train_model, FEATURE_MATRIX_FILES, [XGB_MODEL_PATH], code=[train] + model_code),
+        stage('train_goal_model', goal_model.train_goal_model, [MATCHES_CLEANED], [GOAL_MODEL_PATH], code=[goal_model, storage, registry, tree_backend]),
+        stage('evaluate', evaluate.compare_models, FEATURE_MATRIX_FILES + [XGB_MODEL_PATH, BASELINE_MODEL_PATH, SCALER_PATH], code=[evaluate] + model_code)
+    ]
+    return stages
+
+def run_pipeline(force=False, only=None, jobs=None):
+    print("--- Starting Pipeline ---")
+
+    executed = run_dag(build_stages(), PIPELINE_CACHE_PATH, force=force, only=only, max_workers=jobs)
+
+    print(f"--- Pipeline Completed Successfully ({len(executed)} stage(s) executed) ---")
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the AFCON predictor pipeline.")
+    parser.add_argument('--force', action='store_true', help="Re-run stages even if their inputs are unchanged")
+    parser.add_argument('--only', nargs='+', metavar='STAGE', help="Run only the named stage(s)")
+    parser.add_argument('--jobs', type=int, default=None, help="Maximum number of stages run concurrently")
+    parser.add_argument('--list', action='store_true', help="List the pipeline stages and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        for st in build_stages():
+            print(st['name'])
+        return
+
+    run_pipeline(force=args.force, only=args.only, jobs=args.jobs)
 
 if __name__ == "__main__":
-    run_pipeline()
+    main()
@@ -14,16 +14,38 @@ EXTERNAL_DATA_DIR = DATA_DIR / "external"
 MATCHES_RAW = RAW_DATA_DIR / "matches.csv"
 FIFA_RANKING_RAW = RAW_DATA_DIR / "fifa_ranking.csv"
 GOALS_RAW = RAW_DATA_DIR / "goals.csv"
+SQUAD_VALUES_RAW = RAW_DATA_DIR / "squad_values.csv"
+AFCON_2025_RESULTS = RAW_DATA_DIR / "afcon_2025_results.csv"
 
-MATCHES_CLEANED = PROCESSED_DATA_DIR / "matches_cleaned.csv"
-FIFA_CLEANED = PROCESSED_DATA_DIR / "fifa_cleaned.csv"
-FEATURES_TABLE = PROCESSED_DATA_DIR / "features.csv"
+MATCHES_CLEANED = PROCESSED_DATA_DIR / "matches_cleaned.parquet"
+FIFA_CLEANED = PROCESSED_DATA_DIR / "fifa_cleaned.parquet"
+GOALS_CLEANED = PROCESSED_DATA_DIR / "goals_cleaned.parquet"
+MERGED_TABLE = PROCESSED_DATA_DIR / "merged.parquet"
+FEATURE_PARTS_DIR = PROCESSED_DATA_DIR / "feature_parts"
+FEATURES_TABLE = PROCESSED_DATA_DIR / "features.parquet"
+TEAM_STORE_PATH = PROCESSED_DATA_DIR / "team_store.parquet"
+ELO_STATE_PATH = PROCESSED_DATA_DIR / "elo_state.npz"
+
+# Model-ready arrays built from the feature table (see src/features/schema.py)
+FEATURE_MATRIX_PATH = PROCESSED_DATA_DIR / "feature_matrix.npy"
+LABELS_PATH = PROCESSED_DATA_DIR / "labels.npy"
+MATCH_DATES_PATH = PROCESSED_DATA_DIR / "match_dates.npy"
+MATCH_ROWS_PATH = PROCESSED_DATA_DIR / "match_rows.npy"
+FEATURE_MATRIX_META_PATH = PROCESSED_DATA_DIR / "feature_matrix.json"
 
 # Model Paths
 MODEL_DIR = ROOT_DIR / "models"
 XGB_MODEL_PATH = MODEL_DIR / "xgb_v1.pkl"
 BASELINE_MODEL_PATH = MODEL_DIR / "logistic_baseline.pkl"
 SCALER_PATH = MODEL_DIR / "scaler.pkl"
+GOAL_MODEL_PATH = MODEL_DIR / "goal_model.pkl"
+MODEL_VERSIONS_DIR = MODEL_DIR / "versions"
+
+# Tree inference backend used for serving: 'xgboost' or 'numpy'
+INFERENCE_BACKEND = os.environ.get("AFCON_INFERENCE_BACKEND", "numpy")
+
+# Pipeline
+PIPELINE_CACHE_PATH = PROCESSED_DATA_DIR / "pipeline_cache.json"
 
 # Output Paths
 OUTPUT_DIR = ROOT_DIR / "outputs"
@@ -31,5 +53,5 @@ FIGURES_DIR = OUTPUT_DIR / "figures"
 REPORTS_DIR = OUTPUT_DIR / "reports"
 
 # Ensure directories exist
-for path in [PROCESSED_DATA_DIR, MODEL_DIR, FIGURES_DIR, REPORTS_DIR]:
+for path in [PROCESSED_DATA_DIR, FEATURE_PARTS_DIR, MODEL_DIR, MODEL_VERSIONS_DIR, FIGURES_DIR, REPORTS_DIR]:
     path.mkdir(parents=True, exist_ok=True)
@@ -1,5 +1,6 @@
 import pandas as pd
 from src.config import FIFA_RANKING_RAW, FIFA_CLEANED
+from src.data.storage import save_table
 from src.utils.team_name_map import normalize_team_name
 
 def clean_fifa_rankings():
@@ -22,7 +23,7 @@ def clean_fifa_rankings():
     df = df[relevant_cols]
     
     # Save output
-    df.to_csv(FIFA_CLEANED, index=False)
+    save_table(df, FIFA_CLEANED)
     print(f"Cleaned FIFA rankings saved to {FIFA_CLEANED}")
     return df
 
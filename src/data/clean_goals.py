@@ -1,5 +1,6 @@
 import pandas as pd
-from src.config import GOALS_RAW, PROCESSED_DATA_DIR
+from src.config import GOALS_RAW, GOALS_CLEANED
+from src.data.storage import save_table
 
 def clean_goals():
     df = pd.read_csv(GOALS_RAW)
@@ -11,9 +12,8 @@ def clean_goals():
     goals_per_match = df.groupby(['date', 'home_team', 'away_team', 'team']).size().reset_index(name='goals_scored')
     
     # Save cleaned data
-    output_path = PROCESSED_DATA_DIR / "goals_cleaned.csv"
-    goals_per_match.to_csv(output_path, index=False)
-    print(f"Cleaned goals saved to {output_path}")
+    save_table(goals_per_match, GOALS_CLEANED)
+    print(f"Cleaned goals saved to {GOALS_CLEANED}")
     return goals_per_match
 
 if __name__ == "__main__":
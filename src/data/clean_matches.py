@@ -1,5 +1,6 @@
 import pandas as pd
 from src.config import MATCHES_RAW, MATCHES_CLEANED
+from src.data.storage import save_table
 from src.utils.constants import CAF_TEAMS
 from src.utils.team_name_map import normalize_team_name
 
@@ -26,7 +27,7 @@ def clean_matches():
     df = df.dropna(subset=['home_score', 'away_score'])
     
     # Save cleaned data
-    df.to_csv(MATCHES_CLEANED, index=False)
+    save_table(df, MATCHES_CLEANED)
     print(f"Cleaned matches saved to {MATCHES_CLEANED}")
     return df
 
@@ -1,5 +1,9 @@
 import pandas as pd
-from src.config import MATCHES_RAW, FIFA_RANKING_RAW, GOALS_RAW
+from src.config import MATCHES_RAW, FIFA_RANKING_RAW, GOALS_RAW, AFCON_2025_RESULTS
+from src.utils.team_name_map import normalize_team_name
+
+# Column layout of the headerless tournament results file (as in matches.csv)
+RESULT_COLUMNS = ['date', 'home_team', 'away_team', 'home_score', 'away_score', 'tournament', 'city', 'country', 'neutral']
 
 def load_raw_matches():
     return pd.read_csv(MATCHES_RAW)
@@ -10,6 +14,16 @@ def load_raw_fifa_rankings():
 def load_raw_goals():
     return pd.read_csv(GOALS_RAW)
 
+def load_tournament_results(path=AFCON_2025_RESULTS):
+    """
+    Completed matches of the running tournament in chronological order.
+    """
+    df = pd.read_csv(path, header=None, names=RESULT_COLUMNS, encoding='utf-8-sig')
+    df['home_team'] = df['home_team'].apply(normalize_team_name)
+    df['away_team'] = df['away_team'].apply(normalize_team_name)
+    df['date'] = pd.to_datetime(df['date'])
+    return df.sort_values('date', kind='stable').reset_index(drop=True)
+
 if __name__ == "__main__":
     matches = load_raw_matches()
     print(f"Loaded {len(matches)} matches.")
@@ -1,10 +1,11 @@
 import pandas as pd
 from src.config import MATCHES_CLEANED, FIFA_CLEANED, FEATURES_TABLE
+from src.data.storage import load_table
 from src.utils.team_name_map import normalize_team_name
 
 def merge_fifa_rankings():
-    matches = pd.read_csv(MATCHES_CLEANED)
-    fifa = pd.read_csv(FIFA_CLEANED)
+    matches = load_table(MATCHES_CLEANED, categorical=False)
+    fifa = load_table(FIFA_CLEANED, columns=['rank_date', 'country_full', 'rank', 'total_points', 'rank_change'], categorical=False)
     
     matches['date'] = pd.to_datetime(matches['date'])
     fifa['rank_date'] = pd.to_datetime(fifa['rank_date'])
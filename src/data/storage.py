@@ -0,0 +1,54 @@
+import pandas as pd
+
+# Team name columns share one categorical dtype per table, so home/away/
+# country comparisons keep working on the categorical codes
+TEAM_COLUMNS = ['home_team', 'away_team', 'team', 'country']
+
+# Other low-cardinality string columns stored as categoricals
+CATEGORICAL_COLUMNS = ['country_full', 'tournament', 'city', 'confederation']
+
+def _to_categorical(df):
+    df = df.copy()
+
+    team_cols = [col for col in TEAM_COLUMNS if col in df.columns and df[col].dtype == object]
+    if team_cols:
+        teams = pd.unique(pd.concat([df[col] for col in team_cols]).dropna())
+        team_dtype = pd.CategoricalDtype(sorted(teams))
+        for col in team_cols:
+            df[col] = df[col].astype(team_dtype)
+
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns and df[col].dtype == object:
+            df[col] = df[col].astype('category')
+
+    return df
+
+def save_table(df, path):
+    """
+    Writes a processed table in a typed columnar format (Parquet, or Feather
+    for a .feather path), with team and other label columns as categoricals.
+    """
+    df = _to_categorical(df).reset_index(drop=True)
+
+    if path.suffix == '.feather':
+        df.to_feather(path)
+    else:
+        df.to_parquet(path, index=False)
+
+def load_table(path, columns=None, categorical=True):
+    """
+    Reads a processed table written by save_table. Only the requested
+    `columns` are read from disk. With categorical=False label columns are
+    returned as plain object columns.
+    """
+    if path.suffix == '.feather':
+        df = pd.read_feather(path, columns=columns)
+    else:
+        df = pd.read_parquet(path, columns=columns)
+
+    if not categorical:
+        for col in df.columns:
+            if isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype(object)
+
+    return df
@@ -1,12 +1,13 @@
 import pandas as pd
 from src.config import MATCHES_CLEANED, FIFA_CLEANED, GOALS_RAW
+from src.data.storage import load_table
 from src.utils.constants import CAF_TEAMS
 
 def validate_data():
     print("--- Starting Data Validation ---")
     
-    matches = pd.read_csv(MATCHES_CLEANED)
-    fifa = pd.read_csv(FIFA_CLEANED)
+    matches = load_table(MATCHES_CLEANED, columns=['date', 'home_team', 'away_team'], categorical=False)
+    fifa = load_table(FIFA_CLEANED, columns=['rank_date', 'country_full'], categorical=False)
     
     # 1. Verify team names match across datasets
     match_teams = set(matches['home_team']).union(set(matches['away_team']))
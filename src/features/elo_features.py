@@ -1,58 +1,117 @@
 import pandas as pd
 import numpy as np
 
-def calculate_elo(df):
+INITIAL_ELO = 1500
+
+# Base K-factor
+BASE_K = 10
+
+def _elo_updates(home_ids, away_ids, results, k_factors, ratings):
     """
-    Calculates dynamic Elo ratings for each team.
+    Runs the sequential Elo update over integer-coded matches.
+    `ratings` is updated in place; the pre-match ratings are returned.
     """
-    # Initialize Elo ratings
-    teams = pd.concat([df['home_team'], df['away_team']]).unique()
-    elo_ratings = {team: 1500 for team in teams}
-    
-    home_elo_before = []
-    away_elo_before = []
-    elo_diff = []
-    
-    # Sort by date to ensure chronological calculation
-    df = df.sort_values('date')
-    
-    # Base K-factor
-    BASE_K = 10
-    
-    for index, row in df.iterrows():
-        home_team = row['home_team']
-        away_team = row['away_team']
-        
-        # Get current ratings
-        r_home = elo_ratings[home_team]
-        r_away = elo_ratings[away_team]
-        
-        home_elo_before.append(r_home)
-        away_elo_before.append(r_away)
-        elo_diff.append(r_home - r_away)
-        
+    n = len(home_ids)
+    home_elo_before = np.empty(n)
+    away_elo_before = np.empty(n)
+
+    for i, (h, a, s_home, k) in enumerate(zip(home_ids.tolist(), away_ids.tolist(), results.tolist(), k_factors.tolist())):
+        r_home = ratings[h]
+        r_away = ratings[a]
+
+        home_elo_before[i] = r_home
+        away_elo_before[i] = r_away
+
         # Calculate expected scores
         e_home = 1 / (1 + 10**((r_away - r_home) / 400))
         e_away = 1 - e_home
-        
-        # Actual scores
-        if row['home_score'] > row['away_score']:
-            s_home, s_away = 1, 0
-        elif row['home_score'] < row['away_score']:
-            s_home, s_away = 0, 1
-        else:
-            s_home, s_away = 0.5, 0.5
-            
-        # K-factor adjusted by tournament weight
-        # tournament_weight is already in the df from context_features
-        k = BASE_K * row.get('tournament_weight', 2)
-        
+
         # Update ratings
-        elo_ratings[home_team] = r_home + k * (s_home - e_home)
-        elo_ratings[away_team] = r_away + k * (s_away - e_away)
-        
+        ratings[h] = r_home + k * (s_home - e_home)
+        ratings[a] = r_away + k * ((1 - s_home) - e_away)
+
+    return home_elo_before, away_elo_before
+
+def run_elo(df, state=None):
+    """
+    Calculates dynamic Elo ratings for each team and returns the updated df
+    together with the final rating state. Passing a `state` from a previous
+    run (see load_elo_state) resumes from that snapshot instead of replaying
+    history; `df` must then only hold matches after the state's watermark.
+    """
+    # Sort by date to ensure chronological calculation
+    df = df.sort_values('date')
+
+    if state is not None and len(df) > 0 and df['date'].min() <= state['watermark']:
+        raise ValueError(f"Matches on or before the Elo watermark ({state['watermark'].date()}) are already in the rating state")
+
+    # Map teams to integer ids once, keeping the ids of a resumed state
+    known_teams = list(state['teams']) if state is not None else []
+    new_teams = pd.Index(pd.concat([df['home_team'], df['away_team']]).unique()).difference(known_teams, sort=False)
+    teams = pd.Index(known_teams + list(new_teams))
+
+    ratings = np.full(len(teams), INITIAL_ELO, dtype=float)
+    if state is not None:
+        ratings[:len(known_teams)] = state['ratings']
+
+    home_ids = teams.get_indexer(df['home_team'])
+    away_ids = teams.get_indexer(df['away_team'])
+
+    # Actual home scores (1 win, 0.5 draw, 0 loss)
+    results = np.where(df['home_score'] > df['away_score'], 1.0,
+                       np.where(df['home_score'] < df['away_score'], 0.0, 0.5))
+
+    # K-factor adjusted by tournament weight
+    # tournament_weight is already in the df from context_features
+    if 'tournament_weight' in df.columns:
+        k_factors = BASE_K * df['tournament_weight'].to_numpy(dtype=float)
+    else:
+        k_factors = np.full(len(df), BASE_K * 2.0)
+
+    home_elo_before, away_elo_before = _elo_updates(home_ids, away_ids, results, k_factors, ratings)
+
     df['home_elo'] = home_elo_before
     df['away_elo'] = away_elo_before
-    df['elo_diff'] = elo_diff
-    
+    df['elo_diff'] = home_elo_before - away_elo_before
+
+    if len(df) > 0:
+        watermark = df['date'].max()
+    else:
+        watermark = state['watermark'] if state is not None else pd.NaT
+
+    new_state = {
+        'teams': list(teams),
+        'ratings': ratings,
+        'watermark': pd.Timestamp(watermark)
+    }
+
+    return df, new_state
+
+def calculate_elo(df):
+    """
+    Calculates dynamic Elo ratings for each team.
+    """
+    df, _ = run_elo(df)
     return df
+
+def save_elo_state(state, path):
+    """
+    Saves the final rating vector and watermark date of an Elo run.
+    """
+    np.savez(
+        path,
+        teams=np.array(state['teams'], dtype=str),
+        ratings=state['ratings'],
+        watermark=np.datetime64(state['watermark'], 'ns')
+    )
+
+def load_elo_state(path):
+    """
+    Loads an Elo rating state saved by save_elo_state.
+    """
+    with np.load(path) as data:
+        return {
+            'teams': data['teams'].tolist(),
+            'ratings': data['ratings'].copy(),
+            'watermark': pd.Timestamp(data['watermark'][()])
+        }
@@ -2,48 +2,137 @@ import pandas as pd
 import numpy as np
 from src.utils.constants import ROLLING_WINDOW
 
-def calculate_form(df):
-    # Create a long format to calculate rolling stats per team
-    home = df[['date', 'home_team', 'home_score', 'away_score']].rename(
-        columns={'home_team': 'team', 'home_score': 'goals_for', 'away_score': 'goals_against'}
-    )
-    home['is_home'] = 1
-    
-    away = df[['date', 'away_team', 'away_score', 'home_score']].rename(
-        columns={'away_team': 'team', 'away_score': 'goals_for', 'home_score': 'goals_against'}
-    )
-    away['is_home'] = 0
-    
-    team_stats = pd.concat([home, away]).sort_values(['team', 'date'])
-    
+FORM_COLUMNS = {
+    'rolling_points': 'form',
+    'weighted_points': 'weighted_form',
+    'rolling_goals_for': 'avg_goals_for',
+    'rolling_goals_against': 'avg_goals_against',
+    'rolling_goal_diff': 'goal_diff_form'
+}
+
+def _prefix_sum(values):
+    return np.concatenate([[0.0], np.cumsum(values)])
+
+def _rolling_mean(values, idx, start):
+    """
+    Mean of values[start:idx] for every row, skipping NaNs, from prefix sums.
+    """
+    valid = ~np.isnan(values)
+    total = _prefix_sum(np.where(valid, values, 0.0))
+    count = _prefix_sum(valid)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (total[idx] - total[start]) / (count[idx] - count[start])
+
+def _rolling_weighted_mean(values, idx, start):
+    """
+    Linear-decay weighted mean of values[start:idx] (weights 1..m, most recent
+    heaviest). The ramp kernel is applied through a plain and an
+    index-weighted prefix sum, so no per-window Python call is needed.
+    """
+    total = _prefix_sum(values)
+    indexed_total = _prefix_sum(np.arange(len(values)) * values)
+
+    m = idx - start
+    weighted_sum = (indexed_total[idx] - indexed_total[start]) - (start - 1) * (total[idx] - total[start])
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return weighted_sum / (m * (m + 1) / 2)
+
+def calculate_form(df, windows=(ROLLING_WINDOW,)):
+    """
+    Rolling form features for the home and away side of every match.
+    All windows are computed in one pass over the long-format team table;
+    ROLLING_WINDOW keeps the unsuffixed column names (e.g. home_form), other
+    windows are suffixed with their size (e.g. home_form_10).
+    """
+    n = len(df)
+
+    # Long format: rows [0, n) are the home sides, rows [n, 2n) the away sides
+    teams = np.concatenate([df['home_team'].to_numpy(), df['away_team'].to_numpy()])
+    dates = np.concatenate([df['date'].to_numpy(), df['date'].to_numpy()])
+    goals_for = np.concatenate([df['home_score'].to_numpy(dtype=float), df['away_score'].to_numpy(dtype=float)])
+    goals_against = np.concatenate([df['away_score'].to_numpy(dtype=float), df['home_score'].to_numpy(dtype=float)])
+
+    # Sort once by team and date
+    team_codes, _ = pd.factorize(teams, sort=True)
+    order = np.lexsort((dates, team_codes))
+    team_codes = team_codes[order]
+    goals_for = goals_for[order]
+    goals_against = goals_against[order]
+
     # Calculate points
-    team_stats['points'] = np.where(team_stats['goals_for'] > team_stats['goals_against'], 3,
-                                   np.where(team_stats['goals_for'] == team_stats['goals_against'], 1, 0))
-    
-    # Rolling averages
-    team_stats['rolling_points'] = team_stats.groupby('team')['points'].transform(lambda x: x.shift().rolling(ROLLING_WINDOW, min_periods=1).mean())
-    
-    # Weighted rolling points (Time Decay)
-    def weighted_mean(x):
-        if len(x) == 0: return np.nan
-        weights = np.arange(1, len(x) + 1)
-        return np.sum(x * weights) / np.sum(weights)
-    
-    team_stats['weighted_points'] = team_stats.groupby('team')['points'].transform(
-        lambda x: x.shift().rolling(ROLLING_WINDOW, min_periods=1).apply(weighted_mean, raw=True)
-    )
-    
-    team_stats['rolling_goals_for'] = team_stats.groupby('team')['goals_for'].transform(lambda x: x.shift().rolling(ROLLING_WINDOW, min_periods=1).mean())
-    team_stats['rolling_goals_against'] = team_stats.groupby('team')['goals_against'].transform(lambda x: x.shift().rolling(ROLLING_WINDOW, min_periods=1).mean())
-    team_stats['rolling_goal_diff'] = team_stats['rolling_goals_for'] - team_stats['rolling_goals_against']
-    
-    # Merge back to original df
-    df = df.merge(team_stats[team_stats['is_home'] == 1][['date', 'team', 'rolling_points', 'weighted_points', 'rolling_goals_for', 'rolling_goals_against', 'rolling_goal_diff']], 
-                  left_on=['date', 'home_team'], right_on=['date', 'team'], how='left').drop(columns='team')
-    df = df.rename(columns={'rolling_points': 'home_form', 'weighted_points': 'home_weighted_form', 'rolling_goals_for': 'home_avg_goals_for', 'rolling_goals_against': 'home_avg_goals_against', 'rolling_goal_diff': 'home_goal_diff_form'})
-    
-    df = df.merge(team_stats[team_stats['is_home'] == 0][['date', 'team', 'rolling_points', 'weighted_points', 'rolling_goals_for', 'rolling_goals_against', 'rolling_goal_diff']], 
-                  left_on=['date', 'away_team'], right_on=['date', 'team'], how='left').drop(columns='team')
-    df = df.rename(columns={'rolling_points': 'away_form', 'weighted_points': 'away_weighted_form', 'rolling_goals_for': 'away_avg_goals_for', 'rolling_goals_against': 'away_avg_goals_against', 'rolling_goal_diff': 'away_goal_diff_form'})
-    
+    points = np.where(goals_for > goals_against, 3.0, np.where(goals_for == goals_against, 1.0, 0.0))
+
+    # Position of each row within its team's history
+    idx = np.arange(2 * n)
+    is_first = np.r_[True, team_codes[1:] != team_codes[:-1]]
+    group_start = np.maximum.accumulate(np.where(is_first, idx, 0))
+    games_before = idx - group_start
+
+    for window in windows:
+        # Window covers the (up to) `window` previous matches of the team
+        start = idx - np.minimum(games_before, window)
+
+        rolling_goals_for = _rolling_mean(goals_for, idx, start)
+        rolling_goals_against = _rolling_mean(goals_against, idx, start)
+
+        # Weighted rolling points (Time Decay); only defined once a full
+        # window of history exists, as with the previous rolling().apply()
+        weighted_points = _rolling_weighted_mean(points, idx, start)
+        weighted_points[games_before < window] = np.nan
+
+        stats = {
+            'rolling_points': _rolling_mean(points, idx, start),
+            'weighted_points': weighted_points,
+            'rolling_goals_for': rolling_goals_for,
+            'rolling_goals_against': rolling_goals_against,
+            'rolling_goal_diff': rolling_goals_for - rolling_goals_against
+        }
+
+        # Scatter back to the unsorted long table, then split by position
+        suffix = '' if window == ROLLING_WINDOW else f'_{window}'
+        for side, rows in (('home', slice(0, n)), ('away', slice(n, 2 * n))):
+            for stat, name in FORM_COLUMNS.items():
+                values = np.empty(2 * n)
+                values[order] = stats[stat]
+                df[f'{side}_{name}{suffix}'] = values[rows]
+
     return df
+
+def latest_form(df, teams, window=ROLLING_WINDOW):
+    """
+    Form of each of `teams` going into its next match, from its last
+    `window` results in `df`: the values calculate_form would give a match
+    played after all of them. Returns a DataFrame indexed by team with the
+    FORM_COLUMNS names (form, weighted_form, ...); teams without results
+    are NaN.
+    """
+    n = len(df)
+    long = pd.DataFrame({
+        'team': np.concatenate([df['home_team'].to_numpy(), df['away_team'].to_numpy()]),
+        'date': np.concatenate([df['date'].to_numpy(), df['date'].to_numpy()]),
+        'goals_for': np.concatenate([df['home_score'].to_numpy(dtype=float), df['away_score'].to_numpy(dtype=float)]),
+        'goals_against': np.concatenate([df['away_score'].to_numpy(dtype=float), df['home_score'].to_numpy(dtype=float)])
+    })
+    long = long[long['team'].isin(teams)]
+
+    # Same order as calculate_form: by date, then home sides before away sides
+    long = long.sort_values(['team', 'date'], kind='stable').groupby('team').tail(window)
+    long['points'] = np.where(long['goals_for'] > long['goals_against'], 3.0,
+                              np.where(long['goals_for'] == long['goals_against'], 1.0, 0.0))
+    # Linear-decay weights 1..m, most recent heaviest
+    long['weight'] = long.groupby('team').cumcount() + 1.0
+
+    by_team = long.groupby('team')
+    games = by_team.size()
+    weighted = (long['points'] * long['weight']).groupby(long['team']).sum() / (games * (games + 1) / 2)
+
+    form = pd.DataFrame({
+        'form': by_team['points'].mean(),
+        'weighted_form': weighted.where(games >= window),
+        'avg_goals_for': by_team['goals_for'].mean(),
+        'avg_goals_against': by_team['goals_against'].mean()
+    })
+    form['goal_diff_form'] = form['avg_goals_for'] - form['avg_goals_against']
+    return form.reindex(list(teams))
@@ -1,32 +1,65 @@
 import pandas as pd
+import numpy as np
+
+def _h2h_counts(dates, home_teams, away_teams, home_scores, away_scores):
+    """
+    Walks the matches once in date order, keeping running win/draw/game counts
+    per unordered team pair. Matches played on the same date only see meetings
+    from strictly earlier dates.
+    """
+    n = len(dates)
+    win_rate = np.full(n, 0.5)
+    game_count = np.zeros(n)
+
+    # pair -> [wins of first team, wins of second team, draws, games]
+    pair_stats = {}
+    pending = []
+    current_date = None
+
+    for i in range(n):
+        if dates[i] != current_date:
+            # Commit the previous date's results before reading the new date
+            for key, slot in pending:
+                stats = pair_stats.setdefault(key, [0, 0, 0, 0])
+                stats[slot] += 1
+                stats[3] += 1
+            pending = []
+            current_date = dates[i]
+
+        home, away = home_teams[i], away_teams[i]
+        if home <= away:
+            key, home_slot, away_slot = (home, away), 0, 1
+        else:
+            key, home_slot, away_slot = (away, home), 1, 0
+
+        stats = pair_stats.get(key)
+        if stats is not None:
+            win_rate[i] = (stats[home_slot] + 0.5 * stats[2]) / stats[3]
+            game_count[i] = stats[3]
+
+        if home_scores[i] > away_scores[i]:
+            pending.append((key, home_slot))
+        elif home_scores[i] < away_scores[i]:
+            pending.append((key, away_slot))
+        else:
+            pending.append((key, 2))
+
+    return win_rate, game_count
 
 def calculate_h2h(df):
     # Sort by date to ensure we only use past games
     df = df.sort_values('date')
-    
-    def get_h2h_stats(row, data):
-        # Filter for past games between these two teams
-        past_games = data[(data['date'] < row['date']) & 
-                          (((data['home_team'] == row['home_team']) & (data['away_team'] == row['away_team'])) |
-                           ((data['home_team'] == row['away_team']) & (data['away_team'] == row['home_team'])))]
-        
-        if len(past_games) == 0:
-            return 0.5, 0 # Default to 0.5 win rate if no history
-        
-        # Calculate home team's win rate against this specific opponent
-        home_wins = len(past_games[((past_games['home_team'] == row['home_team']) & (past_games['home_score'] > past_games['away_score'])) |
-                                   ((past_games['away_team'] == row['home_team']) & (past_games['away_score'] > past_games['home_score']))])
-        
-        draws = len(past_games[past_games['home_score'] == past_games['away_score']])
-        
-        # Win rate: (wins + 0.5 * draws) / total
-        win_rate = (home_wins + 0.5 * draws) / len(past_games)
-        
-        return win_rate, len(past_games)
-
-    # Apply the function
-    h2h_results = df.apply(lambda row: get_h2h_stats(row, df), axis=1, result_type='expand')
-    df['h2h_win_rate'] = h2h_results[0]
-    df['h2h_game_count'] = h2h_results[1]
-    
+
+    win_rate, game_count = _h2h_counts(
+        df['date'].to_numpy(),
+        df['home_team'].to_numpy(),
+        df['away_team'].to_numpy(),
+        df['home_score'].to_numpy(),
+        df['away_score'].to_numpy()
+    )
+
+    # Default to 0.5 win rate and 0 games if no history
+    df['h2h_win_rate'] = win_rate
+    df['h2h_game_count'] = game_count
+
     return df
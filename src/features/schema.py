@@ -0,0 +1,122 @@
+import json
+import numpy as np
+import pandas as pd
+from src.config import (
+    FEATURES_TABLE, FEATURE_MATRIX_PATH, LABELS_PATH, MATCH_DATES_PATH, MATCH_ROWS_PATH, FEATURE_MATRIX_META_PATH
+)
+from src.data.storage import load_table
+
+# Feature order expected by the match model
+MATCH_FEATURES = [
+    'home_rank', 'away_rank', 'home_points', 'away_points',
+    'home_form', 'away_form', 'home_weighted_form', 'away_weighted_form',
+    'home_goal_diff_form', 'away_goal_diff_form',
+    'rank_diff', 'point_diff', 'home_rank_momentum', 'away_rank_momentum',
+    'h2h_win_rate', 'h2h_game_count', 'is_home_adv', 'is_neutral', 'tournament_weight',
+    'home_elo', 'away_elo', 'elo_diff', 'home_travel_dist', 'away_travel_dist',
+    'home_squad_value', 'away_squad_value', 'home_squad_quality', 'away_squad_quality',
+    'log_home_value', 'log_away_value', 'value_diff', 'value_ratio', 'quality_diff'
+]
+
+# Dtypes of the cached matrix, labels and match dates
+FEATURE_DTYPE = np.float32
+LABEL_DTYPE = np.int8
+DATE_DTYPE = 'datetime64[D]'
+
+# Outcome classes: 0 for Home Win, 1 for Draw, 2 for Away Win
+OUTCOMES = ['Home Win', 'Draw', 'Away Win']
+
+# Matches from this date on are held out for evaluation
+TEST_START = np.datetime64('2024-01-01')
+
+def outcome_labels(home_score, away_score):
+    home_score, away_score = np.asarray(home_score), np.asarray(away_score)
+    return np.select([home_score > away_score, home_score < away_score], [0, 2], 1).astype(LABEL_DTYPE)
+
+def split_ranges(dates):
+    """
+    [start, stop) row ranges of the train (before TEST_START) and test
+    splits of date-sorted matches.
+    """
+    n_train = int(np.searchsorted(dates, TEST_START))
+    return {'train': [0, n_train], 'test': [n_train, len(dates)]}
+
+def build_feature_matrix(table_path=FEATURES_TABLE):
+    """
+    Builds the prepared dataset from the feature table: a contiguous
+    float32 array with columns in MATCH_FEATURES order, the outcome labels,
+    the match dates and each match's row in the feature table, for matches
+    with every feature present, in date order. The arrays are saved as .npy
+    files so consumers can memory-map them, and the train/test row ranges
+    are saved alongside.
+    """
+    df = load_table(table_path, columns=['date', 'home_score', 'away_score'] + MATCH_FEATURES, categorical=False)
+
+    # Drop rows with NaN in features (e.g., early matches with no FIFA rank)
+    df = df.dropna(subset=MATCH_FEATURES)
+
+    # Date order makes every time split a contiguous row range
+    df = df.sort_values('date', kind='stable')
+
+    X = np.ascontiguousarray(df[MATCH_FEATURES].to_numpy(dtype=FEATURE_DTYPE))
+    y = outcome_labels(df['home_score'], df['away_score'])
+    dates = pd.to_datetime(df['date']).to_numpy().astype(DATE_DTYPE)
+    rows = df.index.to_numpy(dtype=np.int64)
+
+    np.save(FEATURE_MATRIX_PATH, X)
+    np.save(LABELS_PATH, y)
+    np.save(MATCH_DATES_PATH, dates)
+    np.save(MATCH_ROWS_PATH, rows)
+    with open(FEATURE_MATRIX_META_PATH, 'w') as f:
+        json.dump({
+            'features': MATCH_FEATURES,
+            'rows': len(X),
+            'test_start': str(TEST_START),
+            'splits': split_ranges(dates)
+        }, f, indent=2)
+
+    print(f"Feature matrix ({X.shape[0]} x {X.shape[1]}, {X.nbytes / 1e6:.1f} MB) saved to {FEATURE_MATRIX_PATH}")
+    return X, y, dates
+
+def _matrix_is_current(table_path):
+    paths = [FEATURE_MATRIX_PATH, LABELS_PATH, MATCH_DATES_PATH, MATCH_ROWS_PATH, FEATURE_MATRIX_META_PATH]
+    if not all(path.exists() for path in paths):
+        return False
+    if min(path.stat().st_mtime_ns for path in paths) < table_path.stat().st_mtime_ns:
+        return False
+    with open(FEATURE_MATRIX_META_PATH) as f:
+        meta = json.load(f)
+    return meta['features'] == MATCH_FEATURES and meta.get('test_start') == str(TEST_START)
+
+def load_dataset(table_path=FEATURES_TABLE, mmap=True):
+    """
+    The prepared dataset: {'X', 'y', 'dates', 'rows'} arrays memory-mapped
+    read-only from the cached .npy files (unless mmap=False), and 'train'
+    and 'test' row slices. Slicing a memory-mapped array is zero-copy, and
+    processes forked for parallel work share its pages. The files are
+    rebuilt first if the feature table or the schema changed since they
+    were written.
+    """
+    if not _matrix_is_current(table_path):
+        build_feature_matrix(table_path)
+
+    mode = 'r' if mmap else None
+    with open(FEATURE_MATRIX_META_PATH) as f:
+        splits = json.load(f)['splits']
+
+    dataset = {
+        'X': np.load(FEATURE_MATRIX_PATH, mmap_mode=mode),
+        'y': np.load(LABELS_PATH, mmap_mode=mode),
+        'dates': np.load(MATCH_DATES_PATH, mmap_mode=mode),
+        'rows': np.load(MATCH_ROWS_PATH, mmap_mode=mode)
+    }
+    for name, (start, stop) in splits.items():
+        dataset[name] = slice(start, stop)
+    return dataset
+
+def feature_frame(X):
+    """
+    DataFrame view of a feature matrix with the MATCH_FEATURES column
+    names, so fitted models keep their feature names.
+    """
+    return pd.DataFrame(X, columns=MATCH_FEATURES, copy=False)
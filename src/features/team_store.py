@@ -0,0 +1,107 @@
+import pandas as pd
+import numpy as np
+from src.config import FEATURES_TABLE, TEAM_STORE_PATH
+from src.data.storage import load_table, save_table
+from src.features.form_features import latest_form
+from src.features.elo_features import run_elo
+from src.features.context_features import calculate_context_features
+
+# Team state field -> (home column, away column) in the feature table
+TEAM_STATE_FIELDS = {
+    'rank': ('home_rank', 'away_rank'),
+    'points': ('home_points', 'away_points'),
+    'form': ('home_form', 'away_form'),
+    'weighted_form': ('home_weighted_form', 'away_weighted_form'),
+    'goal_diff_form': ('home_goal_diff_form', 'away_goal_diff_form'),
+    'rank_momentum': ('home_rank_momentum', 'away_rank_momentum'),
+    'elo': ('home_elo', 'away_elo'),
+    'travel_dist': ('home_travel_dist', 'away_travel_dist'),
+    'squad_value': ('home_squad_value', 'away_squad_value'),
+    'squad_quality': ('home_squad_quality', 'away_squad_quality'),
+    'log_value': ('log_home_value', 'log_away_value')
+}
+
+# Columns needed to rebuild each team's latest state
+TEAM_STATE_COLUMNS = ['date', 'home_team', 'away_team'] + [col for pair in TEAM_STATE_FIELDS.values() for col in pair]
+
+def build_team_store(df):
+    """
+    One row per team holding its state as of its most recent match.
+    """
+    sides = []
+    for side, i in [('home', 0), ('away', 1)]:
+        cols = {pair[i]: field for field, pair in TEAM_STATE_FIELDS.items()}
+        part = df[['date', f'{side}_team'] + list(cols)].rename(columns={f'{side}_team': 'team', **cols})
+        part['position'] = np.arange(len(df))
+        sides.append(part)
+
+    long = pd.concat(sides, ignore_index=True)
+    long['team'] = long['team'].astype(object)
+
+    # Latest match per team; ties on date resolve to the later row
+    long = long.sort_values(['date', 'position'], kind='stable')
+    store = long.drop_duplicates('team', keep='last').sort_values('team')
+
+    store = store.rename(columns={'date': 'last_match_date'}).drop(columns='position')
+    store.insert(0, 'team_id', np.arange(len(store)))
+    return store.reset_index(drop=True)
+
+def materialize_team_store():
+    df = load_table(FEATURES_TABLE, columns=TEAM_STATE_COLUMNS, categorical=False)
+    store = build_team_store(df)
+    save_table(store, TEAM_STORE_PATH)
+    print(f"Team store with {len(store)} teams saved to {TEAM_STORE_PATH}")
+    return store
+
+def load_team_store(path=TEAM_STORE_PATH):
+    """
+    Loads the team store indexed by team name for constant-time lookups.
+    """
+    store = load_table(path, categorical=False)
+    return store.set_index('team', drop=False)
+
+def get_team_state(store, team):
+    """
+    Latest state of a team as a dict of TEAM_STATE_FIELDS, or None if the
+    team has no recorded matches.
+    """
+    if team not in store.index:
+        return None
+    row = store.loc[team]
+    return {field: row[field] for field in TEAM_STATE_FIELDS}
+
+def update_team_store(store, teams, matches, results, elo_state):
+    """
+    Moves the Elo and form state of `teams` forward to just before their
+    next match, given the match history and the tournament `results`,
+    without rebuilding the feature table. Results after the Elo state's
+    watermark are applied to the ratings incrementally. Other fields keep
+    their stored values.
+    """
+    key = ['date', 'home_team', 'away_team']
+    new = results.merge(matches[key], on=key, how='left', indicator=True)
+    new = new[new['_merge'] == 'left_only'].drop(columns='_merge')
+    history = pd.concat([matches, new[matches.columns]], ignore_index=True)
+
+    # Elo: ratings after every known result
+    unrated = calculate_context_features(results[results['date'] > elo_state['watermark']].copy())
+    _, elo_state = run_elo(unrated, elo_state)
+    ratings = pd.Series(elo_state['ratings'], index=elo_state['teams'])
+
+    # Form: each team's last results, as going into its next match
+    played = history[history['home_team'].isin(teams) | history['away_team'].isin(teams)]
+    form = latest_form(played, teams)
+
+    store = store.copy()
+    known = [team for team in teams if team in store.index]
+    store.loc[known, 'elo'] = ratings.reindex(known).to_numpy()
+    for field in ['form', 'weighted_form', 'goal_diff_form']:
+        store.loc[known, field] = form.loc[known, field].to_numpy()
+
+    last_played = pd.concat([played[['date', 'home_team']].set_axis(['date', 'team'], axis=1),
+                             played[['date', 'away_team']].set_axis(['date', 'team'], axis=1)]).groupby('team')['date'].max()
+    store.loc[known, 'last_match_date'] = last_played.reindex(known).to_numpy()
+    return store
+
+if __name__ == "__main__":
+    materialize_team_store()
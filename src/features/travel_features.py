@@ -2,6 +2,13 @@ import pandas as pd
 import numpy as np
 from src.utils.geo_data import CAF_CAPITALS, MOROCCO_CITIES
 
+# Distance used for teams without a known capital (non-CAF or unknown)
+DEFAULT_TRAVEL_DIST = 5000
+
+# Matches of a team in the same tournament more than this many days apart
+# are treated as separate editions for cumulative travel
+TOURNAMENT_GAP_DAYS = 60
+
 def haversine(lat1, lon1, lat2, lon2):
     """
     Calculate the great circle distance between two points 
@@ -18,26 +25,82 @@ def haversine(lat1, lon1, lat2, lon2):
     r = 6371 # Radius of earth in kilometers. Use 3956 for miles
     return c * r
 
-def calculate_travel_distance(df):
+def build_distance_matrix(origins=CAF_CAPITALS, venues=MOROCCO_CITIES):
+    """
+    Distance (km) from every origin to every venue, as an origins x venues
+    DataFrame. Both arguments map names to (latitude, longitude).
+    """
+    origin_coords = np.array(list(origins.values()), dtype=float).reshape(-1, 2)
+    venue_coords = np.array(list(venues.values()), dtype=float).reshape(-1, 2)
+
+    dist = haversine(origin_coords[:, [0]], origin_coords[:, [1]], venue_coords[:, 0], venue_coords[:, 1])
+    return pd.DataFrame(dist, index=list(origins), columns=list(venues))
+
+# Team x host city distances for AFCON 2025, built once
+DISTANCE_MATRIX = build_distance_matrix()
+
+def _tournament_travel(teams, venue_ids, tournaments, dates, team_dist, venue_dist):
+    """
+    Cumulative distance each team has travelled within a tournament edition:
+    capital to the first venue, then venue to venue.
+    """
+    team_ids = pd.Index(team_dist.index).get_indexer(teams)
+    team_codes, _ = pd.factorize(teams)
+    tournament_codes, _ = pd.factorize(tournaments)
+
+    order = np.lexsort((dates, tournament_codes, team_codes))
+    team_codes = team_codes[order]
+    tournament_codes = tournament_codes[order]
+    sorted_dates = dates[order]
+    sorted_venues = venue_ids[order]
+    sorted_team_ids = team_ids[order]
+
+    # A new edition starts on a new team/tournament or after a long gap
+    gap = np.diff(sorted_dates) > np.timedelta64(TOURNAMENT_GAP_DAYS, 'D')
+    new_edition = np.r_[True, (team_codes[1:] != team_codes[:-1]) | (tournament_codes[1:] != tournament_codes[:-1]) | gap]
+    edition = np.cumsum(new_edition)
+
+    first_leg = np.where(sorted_team_ids >= 0, team_dist.to_numpy()[sorted_team_ids, sorted_venues], DEFAULT_TRAVEL_DIST)
+    prev_venues = np.roll(sorted_venues, 1)
+    legs = np.where(new_edition, first_leg, venue_dist.to_numpy()[prev_venues, sorted_venues])
+
+    cumulative = np.empty(len(legs))
+    cumulative[order] = pd.Series(legs).groupby(edition).cumsum().to_numpy()
+    return cumulative
+
+def calculate_travel_distance(df, venues=MOROCCO_CITIES, default_venue='Rabat'):
     """
     Calculates the travel distance for each team to the match city.
-    If the city is not in Morocco host cities, it defaults to Rabat.
-    """
-    def get_dist(team, city):
-        if team not in CAF_CAPITALS:
-            return 5000 # Default for non-CAF or unknown
-        
-        team_coords = CAF_CAPITALS[team]
-        
-        if city in MOROCCO_CITIES:
-            city_coords = MOROCCO_CITIES[city]
-        else:
-            # Default to Rabat if city unknown or not in Morocco
-            city_coords = MOROCCO_CITIES['Rabat']
-            
-        return haversine(team_coords[0], team_coords[1], city_coords[0], city_coords[1])
-
-    df['home_travel_dist'] = df.apply(lambda x: get_dist(x['home_team'], x['city']), axis=1)
-    df['away_travel_dist'] = df.apply(lambda x: get_dist(x['away_team'], x['city']), axis=1)
-    
+    If the city is not one of the host `venues`, it defaults to `default_venue`.
+    Also adds the cumulative travel of each team within the tournament, for
+    matches played in one of the host `venues` only (NaN elsewhere, where
+    the venue is unknown).
+    """
+    team_dist = DISTANCE_MATRIX if venues is MOROCCO_CITIES else build_distance_matrix(venues=venues)
+    venue_dist = build_distance_matrix(venues, venues)
+
+    # Integer-code venues once; unknown cities fall back to the default venue
+    venue_ids = team_dist.columns.get_indexer(df['city'])
+    hosted = venue_ids >= 0
+    venue_ids[~hosted] = team_dist.columns.get_loc(default_venue)
+
+    dist = team_dist.to_numpy()
+    for side in ['home', 'away']:
+        team_ids = team_dist.index.get_indexer(df[f'{side}_team'])
+        df[f'{side}_travel_dist'] = np.where(team_ids >= 0, dist[team_ids, venue_ids], DEFAULT_TRAVEL_DIST)
+
+    hosted_df = df[hosted]
+    n = len(hosted_df)
+    cumulative = _tournament_travel(
+        np.concatenate([hosted_df['home_team'].to_numpy(), hosted_df['away_team'].to_numpy()]),
+        np.concatenate([venue_ids[hosted], venue_ids[hosted]]),
+        np.concatenate([hosted_df['tournament'].to_numpy(), hosted_df['tournament'].to_numpy()]),
+        np.concatenate([hosted_df['date'].to_numpy(), hosted_df['date'].to_numpy()]),
+        team_dist,
+        venue_dist
+    )
+    for side, values in [('home', cumulative[:n]), ('away', cumulative[n:])]:
+        df[f'{side}_tournament_travel'] = np.nan
+        df.loc[hosted, f'{side}_tournament_travel'] = values
+
     return df
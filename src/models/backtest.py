@@ -1,79 +1,215 @@
+import argparse
+import time
 import pandas as pd
-import pickle
 import numpy as np
-from src.config import XGB_MODEL_PATH, FEATURES_TABLE
+from src.config import FEATURES_TABLE, REPORTS_DIR
+from src.data.storage import load_table
+from src.features.schema import load_dataset, feature_frame
+from src.models.registry import get_model
+from src.utils.team_name_map import normalize_team_name
 
-def backtest_strategy(threshold=0.6, bet_size=10):
+# Bookmaker margin of the simulated odds used when no real odds are given
+SIMULATED_MARGIN = 0.05
+
+ODDS_COLUMNS = ['home_odds', 'draw_odds', 'away_odds']
+
+SWEEP_PATH = REPORTS_DIR / "backtest_sweep.csv"
+
+def predict_test_matches():
+    """
+    Test-split matches (2024-2025) with the model's outcome probabilities,
+    predicted in one call.
+    """
+    model = get_model('xgb')
+    data = load_dataset()
+    test = data['test']
+
+    y_prob = model.predict_proba(feature_frame(data['X'][test]))
+
+    teams = load_table(FEATURES_TABLE, columns=['home_team', 'away_team'], categorical=False)
+    matches = teams.iloc[data['rows'][test]].reset_index(drop=True)
+    matches.insert(0, 'date', pd.to_datetime(data['dates'][test]))
+    matches['target'] = data['y'][test]
+    matches['max_prob'] = np.max(y_prob, axis=1)
+    matches['pred_outcome'] = np.argmax(y_prob, axis=1)
+    return matches
+
+def load_odds(path):
+    """
+    Historical decimal odds from a CSV with date, home_team, away_team,
+    home_odds, draw_odds and away_odds columns.
+    """
+    odds = pd.read_csv(path, parse_dates=['date'])
+    for col in ['home_team', 'away_team']:
+        odds[col] = odds[col].map(normalize_team_name)
+    return odds[['date', 'home_team', 'away_team'] + ODDS_COLUMNS].drop_duplicates(['date', 'home_team', 'away_team'])
+
+def attach_odds(matches, odds=None):
     """
-    Simulates a betting strategy based on model probabilities.
-    Since we don't have real odds, we'll simulate 'fair' odds with a bookmaker margin.
+    Adds the decimal odds of each predicted outcome. Matches without real
+    odds get simulated ones: fair odds of the model's probability with a
+    SIMULATED_MARGIN bookmaker margin.
     """
-    with open(XGB_MODEL_PATH, 'rb') as f:
-        model = pickle.load(f)
-    
-    df = pd.read_csv(FEATURES_TABLE)
-    df['target'] = 1
-    df.loc[df['home_score'] > df['away_score'], 'target'] = 0
-    df.loc[df['home_score'] < df['away_score'], 'target'] = 2
-    
-    features = [
-        'home_rank', 'away_rank', 'home_points', 'away_points', 
-        'home_form', 'away_form', 'home_weighted_form', 'away_weighted_form',
-        'home_goal_diff_form', 'away_goal_diff_form',
-        'rank_diff', 'point_diff', 'home_rank_momentum', 'away_rank_momentum',
-        'h2h_win_rate', 'h2h_game_count', 'is_home_adv', 'is_neutral', 'tournament_weight',
-        'home_elo', 'away_elo', 'elo_diff', 'home_travel_dist', 'away_travel_dist'
-    ]
-    
-    df = df.dropna(subset=features)
-    
-    # Test on 2024-2025 data
-    df['date'] = pd.to_datetime(df['date'])
-    test_df = df[df['date'].dt.year >= 2024].copy()
-    
-    X = test_df[features]
-    y = test_df['target']
-    
-    y_prob = model.predict_proba(X)
-    
-    # Simulate odds: Fair odds = 1/prob. Bookie odds = Fair odds * 0.95 (5% margin)
-    # In a real scenario, we would use actual historical odds.
-    # Here we'll just see if the model's 'high confidence' bets are accurate.
-    
-    test_df['max_prob'] = np.max(y_prob, axis=1)
-    test_df['pred_outcome'] = np.argmax(y_prob, axis=1)
-    
+    matches = matches.copy()
+    simulated = (1 / matches['max_prob'].astype(float)) * (1 - SIMULATED_MARGIN)
+    matches['odds'] = simulated
+    matches['real_odds'] = False
+
+    if odds is not None:
+        merged = matches[['date', 'home_team', 'away_team']].merge(odds, on=['date', 'home_team', 'away_team'], how='left')
+        pick_odds = merged[ODDS_COLUMNS].to_numpy()[np.arange(len(matches)), matches['pred_outcome'].to_numpy()]
+        found = ~np.isnan(pick_odds)
+        matches.loc[found, 'odds'] = pick_odds[found]
+        matches['real_odds'] = found
+    return matches
+
+def backtest_strategy(threshold=0.6, bet_size=10, matches=None):
+    """
+    Simulates a betting strategy based on model probabilities: a flat bet on
+    the predicted outcome of every match whose probability reaches
+    `threshold`. `matches` are predictions with odds (see attach_odds);
+    by default they are predicted here with simulated odds.
+    """
+    if matches is None:
+        matches = attach_odds(predict_test_matches())
+
     # Filter for bets above threshold
-    bets = test_df[test_df['max_prob'] >= threshold].copy()
-    
+    bets = matches[matches['max_prob'] >= threshold].copy()
+
     if len(bets) == 0:
         print(f"No bets found with probability >= {threshold}")
         return
-    
+
     bets['is_correct'] = (bets['pred_outcome'] == bets['target'])
-    
+
     # Calculate profit
-    # If correct, we win: bet_size * (1/max_prob * 0.95 - 1)
+    # If correct, we win: bet_size * (odds - 1)
     # If wrong, we lose: bet_size
-    
+
     bets['profit'] = np.where(
         bets['is_correct'],
-        bet_size * ( (1 / bets['max_prob']) * 0.95 - 1 ),
+        bet_size * (bets['odds'] - 1),
         -bet_size
     )
-    
+
     total_profit = bets['profit'].sum()
     roi = (total_profit / (len(bets) * bet_size)) * 100
-    
+
     print(f"--- Backtesting Results (Threshold: {threshold}) ---")
     print(f"Total Bets: {len(bets)}")
     print(f"Accuracy on Bets: {bets['is_correct'].mean():.2%}")
     print(f"Total Profit: ${total_profit:.2f}")
     print(f"ROI: {roi:.2f}%")
-    
+
     return total_profit
 
+def _rule_surface(stake, profit, correct, order, counts, above):
+    """
+    Totals of one stake rule at every threshold. `order` sorts matches by
+    confidence, highest first, so the bets of a threshold are a prefix of
+    it whose length is `counts`; `above` is the (thresholds, matches)
+    mask of bets in date order, for the drawdowns.
+    """
+    placed = stake > 0
+    won = placed & correct
+
+    def prefix(values):
+        return np.concatenate([[0], np.cumsum(values[order])])[counts]
+
+    bets, hits = prefix(placed), prefix(won)
+    staked, total = prefix(stake), prefix(profit)
+
+    # Running profit of every threshold's bets, in date order
+    path = np.cumsum(np.where(above, profit, 0.0), axis=1)
+    drawdown = (np.maximum.accumulate(np.maximum(path, 0), axis=1) - path).max(axis=1)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return {
+            'bets': bets,
+            'hit_rate': hits / bets,
+            'staked': staked,
+            'profit': total,
+            'roi': total / staked * 100,
+            'max_drawdown': drawdown
+        }
+
+def sweep_thresholds(matches, thresholds, bet_size=10, bankroll=1000, kelly_fraction=0.25,
+                     rules=('flat', 'kelly')):
+    """
+    Profit, ROI, hit rate and maximum drawdown for every threshold under the
+    stake `rules`: 'flat' bets `bet_size`, 'kelly' stakes fractional Kelly
+    amounts of `bankroll` (kelly_fraction of the Kelly fraction, without
+    compounding). Kelly needs real prices: simulated odds price in the
+    model's own probability less the margin, so they never give an edge
+    and get no stake. Computed from cumulative sums over the matches sorted
+    by confidence.
+    """
+    p = matches['max_prob'].to_numpy()
+    odds = matches['odds'].to_numpy()
+    correct = (matches['pred_outcome'] == matches['target']).to_numpy()
+    thresholds = np.asarray(thresholds)
+
+    order = np.argsort(-p, kind='stable')
+    counts = len(p) - np.searchsorted(np.sort(p), thresholds, side='left')
+    above = p[None, :] >= thresholds[:, None]
+
+    # Kelly fraction of a bet with win probability p at decimal odds
+    with np.errstate(invalid='ignore', divide='ignore'):
+        kelly = np.where(odds > 1, np.clip((p * odds - 1) / (odds - 1), 0, None), 0.0)
+    stakes = {
+        'flat': np.full(len(p), float(bet_size)),
+        'kelly': bankroll * kelly_fraction * kelly
+    }
+
+    surfaces = []
+    for rule in rules:
+        stake = stakes[rule]
+        profit = np.where(correct, stake * (odds - 1), -stake)
+        surface = pd.DataFrame(_rule_surface(stake, profit, correct, order, counts, above))
+        surface.insert(0, 'rule', rule)
+        surface.insert(0, 'threshold', thresholds)
+        surfaces.append(surface)
+    return pd.concat(surfaces, ignore_index=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest betting on the model's predictions.")
+    parser.add_argument('--sweep', action='store_true', help="Sweep thresholds and stake rules instead of three fixed thresholds")
+    parser.add_argument('--odds', default=None, help="CSV of historical odds (date, home_team, away_team, home_odds, draw_odds, away_odds)")
+    parser.add_argument('--thresholds', type=int, default=1000, help="Number of thresholds in the sweep")
+    parser.add_argument('--bet-size', type=float, default=10)
+    parser.add_argument('--bankroll', type=float, default=1000, help="Bankroll the Kelly stakes are sized on")
+    parser.add_argument('--kelly-fraction', type=float, default=0.25, help="Fraction of the Kelly stake (Kelly needs --odds)")
+    parser.add_argument('--min-bets', type=int, default=20, help="Fewest bets for a threshold to be reported as best")
+    args = parser.parse_args()
+
+    # Predict once; every threshold reuses the same probabilities
+    odds = load_odds(args.odds) if args.odds else None
+    matches = attach_odds(predict_test_matches(), odds)
+    if odds is not None:
+        print(f"Real odds for {matches['real_odds'].sum()} of {len(matches)} matches, simulated for the rest")
+
+    if not args.sweep:
+        for threshold in [0.5, 0.6, 0.7]:
+            backtest_strategy(threshold, args.bet_size, matches)
+        return
+
+    rules = ('flat', 'kelly')
+    if not matches['real_odds'].any():
+        rules = ('flat',)
+        print("No real odds attached (see --odds): simulated odds never give a Kelly edge, so only flat stakes are swept")
+
+    start = time.perf_counter()
+    surface = sweep_thresholds(matches, np.linspace(1 / 3, 1, args.thresholds),
+                               args.bet_size, args.bankroll, args.kelly_fraction, rules)
+    elapsed = time.perf_counter() - start
+
+    surface.to_csv(SWEEP_PATH, index=False)
+    print(f"{len(surface)} threshold x stake rule results in {elapsed * 1000:.1f} ms, saved to {SWEEP_PATH}")
+
+    for rule, results in surface[surface['bets'] >= args.min_bets].groupby('rule'):
+        best = results.loc[results['roi'].idxmax()]
+        print(f"Best {rule}: threshold {best['threshold']:.3f}, {best['bets']:.0f} bets, hit rate {best['hit_rate']:.2%}, "
+              f"profit ${best['profit']:.2f}, ROI {best['roi']:.2f}%, max drawdown ${best['max_drawdown']:.2f}")
+
 if __name__ == "__main__":
-    backtest_strategy(threshold=0.5)
-    backtest_strategy(threshold=0.6)
-    backtest_strategy(threshold=0.7)
+    main()
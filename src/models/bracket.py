@@ -0,0 +1,101 @@
+import pandas as pd
+import numpy as np
+
+# Stage reached by the winners of each knockout round, counted from the final
+STAGE_NAMES = ['Winner', 'Final', 'SF', 'QF', 'R16', 'R32']
+
+# Simulations processed per batch to bound memory
+CHUNK_SIZE = 250_000
+
+def stage_names(n_slots):
+    """
+    Names of the stages reached after each round of an n_slots bracket,
+    e.g. ['QF', 'SF', 'Final', 'Winner'] for 16 slots.
+    """
+    n_rounds = int(np.log2(n_slots))
+    if 2 ** n_rounds != n_slots:
+        raise ValueError(f"Bracket size must be a power of two, got {n_slots}")
+    return STAGE_NAMES[:n_rounds][::-1]
+
+def advance_matrix(probs, draw_home_share=0.5):
+    """
+    Probability that the home side of each ordered pair advances. A draw
+    goes to the home side with probability `draw_home_share` (0.5 is a
+    coin flip).
+    """
+    return probs[..., 0] + draw_home_share * probs[..., 1]
+
+def play_knockout(advance, bracket, rng):
+    """
+    Plays out a batch of brackets, one row per simulation and one column per
+    slot, where slots 2k and 2k + 1 meet. Every round takes one batched
+    uniform draw per match. Returns an (n_rounds, N) array counting how
+    often each team won its match in each round.
+    """
+    n_teams = advance.shape[0]
+    n_rounds = len(stage_names(bracket.shape[1]))
+
+    counts = np.zeros((n_rounds, n_teams), dtype=np.int64)
+    for r in range(n_rounds):
+        home = bracket[:, 0::2]
+        away = bracket[:, 1::2]
+        home_advances = rng.random(home.shape) < advance[home, away]
+        bracket = np.where(home_advances, home, away)
+        counts[r] = np.bincount(bracket.ravel(), minlength=n_teams)
+
+    return counts
+
+def simulate_bracket(probs, slots, n_simulations, rng=None, draw_home_share=0.5):
+    """
+    Simulates a fixed knockout bracket n_simulations times at once.
+    `probs` is the N x N x 3 matchup tensor and `slots` the team indices of
+    the first round. Returns the per-round counts of play_knockout.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    slots = np.asarray(slots)
+    advance = advance_matrix(probs, draw_home_share)
+
+    counts = np.zeros((len(stage_names(len(slots))), probs.shape[0]), dtype=np.int64)
+    for start in range(0, n_simulations, CHUNK_SIZE):
+        size = min(CHUNK_SIZE, n_simulations - start)
+        counts += play_knockout(advance, np.broadcast_to(slots, (size, len(slots))), rng)
+
+    return counts
+
+def exact_bracket(probs, slots, draw_home_share=0.5):
+    """
+    Exact probability of each team winning its match in each round of the
+    bracket, computed by propagating per-slot team distributions up the
+    bracket tree. Returns an (n_rounds, N) array with the same layout as
+    simulate_bracket's counts divided by the number of simulations.
+    """
+    slots = np.asarray(slots)
+    # A team never meets itself, so the NaN diagonal can be zeroed
+    advance = np.nan_to_num(advance_matrix(probs, draw_home_share))
+    n_teams = probs.shape[0]
+    n_rounds = len(stage_names(len(slots)))
+
+    # One distribution over teams per bracket slot
+    dist = np.zeros((len(slots), n_teams))
+    dist[np.arange(len(slots)), slots] = 1.0
+
+    reach = np.zeros((n_rounds, n_teams))
+    for r in range(n_rounds):
+        home = dist[0::2]
+        away = dist[1::2]
+        # P(i advances) = P(i in home slot) * sum_j P(j in away slot) * advance[i, j]
+        home_wins = home * (away @ advance.T)
+        away_wins = away * (home @ (1 - advance))
+        dist = home_wins + away_wins
+        reach[r] = dist.sum(axis=0)
+
+    return reach
+
+def results_table(teams, counts, n_simulations):
+    """
+    Per-team probability of reaching each stage, sorted by winner probability.
+    """
+    results = pd.DataFrame({'Team': list(teams)})
+    for name, stage_counts in zip(stage_names(2 ** len(counts)), counts):
+        results[f'{name} Prob'] = stage_counts / n_simulations
+    return results.sort_values('Winner Prob', ascending=False)
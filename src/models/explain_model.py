@@ -1,28 +1,16 @@
 import pandas as pd
-import pickle
 import shap
 import matplotlib.pyplot as plt
-from src.config import XGB_MODEL_PATH, FEATURES_TABLE, FIGURES_DIR
+from src.config import FIGURES_DIR
+from src.features.schema import load_dataset, feature_frame
+from src.models.registry import get_model
 
 def explain_model():
     # Load model
-    with open(XGB_MODEL_PATH, 'rb') as f:
-        model = pickle.load(f)
+    model = get_model('xgb')
     
     # Load data
-    df = pd.read_csv(FEATURES_TABLE)
-    
-    features = [
-        'home_rank', 'away_rank', 'home_points', 'away_points', 
-        'home_form', 'away_form', 'home_weighted_form', 'away_weighted_form',
-        'home_goal_diff_form', 'away_goal_diff_form',
-        'rank_diff', 'point_diff', 'home_rank_momentum', 'away_rank_momentum',
-        'h2h_win_rate', 'h2h_game_count', 'is_home_adv', 'is_neutral', 'tournament_weight',
-        'home_elo', 'away_elo', 'elo_diff', 'home_travel_dist', 'away_travel_dist'
-    ]
-    
-    df = df.dropna(subset=features)
-    X = df[features]
+    X = feature_frame(load_dataset()['X'])
     
     # Initialize SHAP explainer
     explainer = shap.TreeExplainer(model)
@@ -0,0 +1,193 @@
+import pandas as pd
+import numpy as np
+from scipy.optimize import minimize_scalar
+from scipy.sparse import csr_matrix
+from scipy.stats import poisson
+from sklearn.linear_model import PoissonRegressor
+from src.config import MATCHES_CLEANED, GOAL_MODEL_PATH
+from src.models.registry import get_model, save_model
+from src.data.storage import load_table
+
+# Largest goal count per side in a scoreline matrix
+MAX_GOALS = 10
+
+# Matches older than this are not used in the fit
+FIT_START_YEAR = 2000
+
+# Half-life of a match's weight in the fit, in days (time decay)
+HALF_LIFE_DAYS = 3 * 365
+
+# L2 penalty shrinking the ratings of teams with few matches
+ALPHA = 1e-3
+
+def dixon_coles_tau(home_goals, away_goals, lam_home, lam_away, rho):
+    """
+    Dixon-Coles correction for the low scorelines 0-0, 1-0, 0-1 and 1-1.
+    """
+    tau = np.ones(np.broadcast(home_goals, away_goals, lam_home, lam_away).shape)
+    tau = np.where((home_goals == 0) & (away_goals == 0), 1 - lam_home * lam_away * rho, tau)
+    tau = np.where((home_goals == 0) & (away_goals == 1), 1 + lam_home * rho, tau)
+    tau = np.where((home_goals == 1) & (away_goals == 0), 1 + lam_away * rho, tau)
+    tau = np.where((home_goals == 1) & (away_goals == 1), 1 - rho, tau)
+    return tau
+
+def fit_goal_model(matches, as_of=None):
+    """
+    Fits a Dixon-Coles model: each side's goals are Poisson with
+    log-rate = intercept + attack[team] - defence[opponent] (+ home
+    advantage at non-neutral venues), with time-decayed match weights; the
+    low-score correlation rho is then fitted on the resulting rates.
+    """
+    df = matches[matches['date'].dt.year >= FIT_START_YEAR]
+    as_of = as_of if as_of is not None else df['date'].max()
+    age = (as_of - df['date']).dt.days.to_numpy()
+    weights = 0.5 ** (age / HALF_LIFE_DAYS)
+
+    teams = pd.Index(sorted(set(df['home_team']) | set(df['away_team'])))
+    home = teams.get_indexer(df['home_team'])
+    away = teams.get_indexer(df['away_team'])
+    at_home = (~df['neutral'].astype(bool)).to_numpy(dtype=float)
+    n, n_teams = len(df), len(teams)
+
+    # Rows [0, n) model home goals, rows [n, 2n) away goals.
+    # Columns: attack of the scoring side, defence of the conceding side, home flag
+    rows = np.arange(2 * n)
+    attack_cols = np.concatenate([home, away])
+    defence_cols = n_teams + np.concatenate([away, home])
+    X = csr_matrix(
+        (np.concatenate([np.ones(2 * n), -np.ones(2 * n), at_home]),
+         (np.concatenate([rows, rows, np.arange(n)]),
+          np.concatenate([attack_cols, defence_cols, np.full(n, 2 * n_teams)]))),
+        shape=(2 * n, 2 * n_teams + 1)
+    )
+    y = np.concatenate([df['home_score'].to_numpy(dtype=float), df['away_score'].to_numpy(dtype=float)])
+
+    reg = PoissonRegressor(alpha=ALPHA, max_iter=1000)
+    reg.fit(X, y, sample_weight=np.concatenate([weights, weights]))
+
+    params = {
+        'teams': list(teams),
+        'attack': reg.coef_[:n_teams],
+        'defence': reg.coef_[n_teams:2 * n_teams],
+        'home_adv': reg.coef_[-1],
+        'intercept': reg.intercept_
+    }
+
+    # Low-score correlation, by weighted likelihood of the correction term
+    rates = reg.predict(X)
+    lam_home, lam_away = rates[:n], rates[n:]
+    home_goals, away_goals = y[:n], y[n:]
+
+    def neg_log_likelihood(rho):
+        tau = dixon_coles_tau(home_goals, away_goals, lam_home, lam_away, rho)
+        return -(weights * np.log(np.maximum(tau, 1e-12))).sum()
+
+    params['rho'] = minimize_scalar(neg_log_likelihood, bounds=(-0.2, 0.2), method='bounded').x
+    return params
+
+def goal_rates(params, home_teams, away_teams, neutral=True):
+    """
+    Expected goals of each side for paired arrays of teams. Teams without
+    a fitted rating get an average attack and defence.
+    """
+    teams = pd.Index(params['teams'])
+    home = teams.get_indexer(home_teams)
+    away = teams.get_indexer(away_teams)
+
+    attack = np.append(params['attack'], 0.0)
+    defence = np.append(params['defence'], 0.0)
+    home_adv = 0.0 if neutral else params['home_adv']
+
+    lam_home = np.exp(params['intercept'] + attack[home] - defence[away] + home_adv)
+    lam_away = np.exp(params['intercept'] + attack[away] - defence[home])
+    return lam_home, lam_away
+
+def scoreline_matrix(lam_home, lam_away, rho, max_goals=MAX_GOALS):
+    """
+    Scoreline probabilities for every pair of rates. Returns an array of
+    shape lam_home.shape + (max_goals + 1, max_goals + 1) where [..., h, a]
+    is the probability of the score h-a; the mass of scores beyond
+    max_goals is folded back by renormalizing.
+    """
+    lam_home = np.asarray(lam_home, dtype=float)[..., None, None]
+    lam_away = np.asarray(lam_away, dtype=float)[..., None, None]
+    goals = np.arange(max_goals + 1)
+    home_goals, away_goals = goals[:, None], goals[None, :]
+
+    probs = poisson.pmf(home_goals, lam_home) * poisson.pmf(away_goals, lam_away)
+    probs = probs * dixon_coles_tau(home_goals, away_goals, lam_home, lam_away, rho)
+    return probs / probs.sum(axis=(-2, -1), keepdims=True)
+
+def outcome_probs(matrix):
+    """
+    [home win, draw, away win] probabilities of scoreline matrices.
+    """
+    return np.stack([
+        np.tril(matrix, -1).sum(axis=(-2, -1)),
+        np.trace(matrix, axis1=-2, axis2=-1),
+        np.triu(matrix, 1).sum(axis=(-2, -1))
+    ], axis=-1)
+
+def build_scoreline_tensor(teams, params, neutral=True, max_goals=MAX_GOALS):
+    """
+    Scoreline matrices for every ordered pair of `teams` in one
+    N x N x (G + 1) x (G + 1) array; the diagonal is NaN.
+    """
+    n = len(teams)
+    teams = np.asarray(teams, dtype=object)
+    home_idx, away_idx = np.nonzero(~np.eye(n, dtype=bool))
+    lam_home, lam_away = goal_rates(params, teams[home_idx], teams[away_idx], neutral)
+
+    tensor = np.full((n, n, max_goals + 1, max_goals + 1), np.nan)
+    tensor[home_idx, away_idx] = scoreline_matrix(lam_home, lam_away, params['rho'], max_goals)
+    return tensor
+
+def scoreline_cdf(tensor):
+    """
+    Cumulative distribution over the flattened scorelines of each pair,
+    for sampling with sample_scorelines.
+    """
+    cdf = np.cumsum(tensor.reshape(tensor.shape[:2] + (-1,)), axis=-1)
+    # Guard against rounding leaving the last entry just below 1
+    cdf[..., -1] = 1.0
+    return cdf
+
+def sample_scorelines(cdf, home_idx, away_idx, size, rng):
+    """
+    Samples scorelines for `size` runs of the given fixtures with a single
+    uniform draw and one searchsorted over the stacked per-fixture CDFs
+    (fixture k's CDF is shifted by k so the stack stays sorted). Returns
+    (size, n_matches) home and away goal arrays.
+    """
+    n_matches = len(home_idx)
+    n_scores = cdf.shape[-1]
+    max_goals = int(np.sqrt(n_scores)) - 1
+
+    offsets = np.arange(n_matches)
+    stacked = (cdf[home_idx, away_idx] + offsets[:, None]).ravel()
+    u = rng.random((size, n_matches)) + offsets
+
+    flat = np.searchsorted(stacked, u, side='right') - offsets * n_scores
+    flat = np.minimum(flat, n_scores - 1)
+    return flat // (max_goals + 1), flat % (max_goals + 1)
+
+def train_goal_model():
+    """
+    Fits the goal model on the final scores of the cleaned matches. The
+    cleaned goals table is deliberately not used: the model only needs
+    each side's goal count, which the match scores already give for every
+    match, including goalless ones the goals table has no rows for.
+    """
+    matches = load_table(MATCHES_CLEANED, columns=['date', 'home_team', 'away_team', 'home_score', 'away_score', 'neutral'], categorical=False)
+    params = fit_goal_model(matches)
+
+    save_model('goal_model', params)
+
+    print(f"Goal model ({len(params['teams'])} teams, rho={params['rho']:.3f}) saved to {GOAL_MODEL_PATH}")
+    return params
+
+def load_goal_model():
+    return get_model('goal_model')
+
+if __name__ == "__main__":
+    train_goal_model()
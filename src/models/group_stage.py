@@ -0,0 +1,260 @@
+import numpy as np
+from src.models.bracket import CHUNK_SIZE, advance_matrix, play_knockout
+from src.models.goal_model import sample_scorelines
+
+# AFCON 2025 group draw
+AFCON_2025_GROUPS = {
+    'A': ['Morocco', 'Mali', 'Zambia', 'Comoros'],
+    'B': ['Egypt', 'South Africa', 'Angola', 'Zimbabwe'],
+    'C': ['Nigeria', 'Tunisia', 'Uganda', 'Tanzania'],
+    'D': ['Senegal', 'DR Congo', 'Benin', 'Botswana'],
+    'E': ['Algeria', 'Burkina Faso', 'Equatorial Guinea', 'Sudan'],
+    'F': ['Ivory Coast', 'Cameroon', 'Gabon', 'Mozambique']
+}
+
+# Round-robin pairings within a group of four (positions in the group list)
+GROUP_PAIRINGS = [(0, 1), (2, 3), (0, 2), (1, 3), (0, 3), (1, 2)]
+
+# Groups of the third-placed teams facing the winners of groups A, B, C and D,
+# keyed by the four groups whose third-placed teams qualified
+THIRD_PLACE_TABLE = {
+    'ABCD': 'CDAB', 'ABCE': 'CABE', 'ABCF': 'CABF', 'ABDE': 'DABE', 'ABDF': 'DABF',
+    'ABEF': 'EABF', 'ACDE': 'CDAE', 'ACDF': 'CDAF', 'ACEF': 'CAFE', 'ADEF': 'DAFE',
+    'BCDE': 'CDBE', 'BCDF': 'CDBF', 'BCEF': 'ECBF', 'BDEF': 'EDBF', 'CDEF': 'CDFE'
+}
+
+# Round of 16 slots in bracket order; slots 2k and 2k + 1 meet.
+# ('1', 'A') is the winner of group A, ('3', 'A') the third-placed team
+# drawn against the winner of group A.
+R16_LAYOUT = [
+    ('1', 'D'), ('3', 'D'),
+    ('2', 'A'), ('2', 'C'),
+    ('1', 'A'), ('3', 'A'),
+    ('2', 'B'), ('2', 'F'),
+    ('1', 'B'), ('3', 'B'),
+    ('1', 'C'), ('3', 'C'),
+    ('1', 'E'), ('2', 'D'),
+    ('2', 'E'), ('1', 'F')
+]
+
+def fit_scoreline_params(matches):
+    """
+    Average goal counts used to turn sampled outcomes into scorelines:
+    goals per side in draws, goals of the losing side, and the winning
+    margin beyond one goal.
+    """
+    home, away = matches['home_score'], matches['away_score']
+    draws = home == away
+    margin = (home - away).abs()[~draws]
+
+    return {
+        'draw_goals': home[draws].mean(),
+        'loser_goals': np.minimum(home, away)[~draws].mean(),
+        'win_margin': margin.mean() - 1
+    }
+
+def group_fixtures(groups):
+    """
+    Home and away team indices of every group match, with teams indexed in
+    the order they appear in `groups`.
+    """
+    home, away = [], []
+    for g in range(len(groups)):
+        for i, j in GROUP_PAIRINGS:
+            home.append(4 * g + i)
+            away.append(4 * g + j)
+    return np.array(home), np.array(away)
+
+def locked_results(groups, results):
+    """
+    Splits played `results` into group fixtures and knockout matches. A
+    group fixture is the first meeting of two teams of the same group.
+    Returns a (played, home_goals, away_goals) tuple over the group_fixtures
+    order, and the knockout results as (winner, loser) team indices; drawn
+    knockout matches (decided on penalties) have no recorded winner and are
+    left to the simulation.
+    """
+    teams = [t for g in groups.values() for t in g]
+    team_idx = {team: i for i, team in enumerate(teams)}
+    home_idx, away_idx = group_fixtures(groups)
+    fixture_idx = {}
+    for f, (h, a) in enumerate(zip(home_idx.tolist(), away_idx.tolist())):
+        fixture_idx[(h, a)] = (f, False)
+        fixture_idx[(a, h)] = (f, True)
+
+    played = np.zeros(len(home_idx), dtype=bool)
+    home_goals = np.zeros(len(home_idx), dtype=np.int64)
+    away_goals = np.zeros(len(home_idx), dtype=np.int64)
+    knockout = []
+
+    for row in results.itertuples(index=False):
+        if row.home_team not in team_idx or row.away_team not in team_idx:
+            continue
+        h, a = team_idx[row.home_team], team_idx[row.away_team]
+        score = (int(row.home_score), int(row.away_score))
+
+        fixture = fixture_idx.get((h, a))
+        if fixture is not None and not played[fixture[0]]:
+            f, swapped = fixture
+            played[f] = True
+            home_goals[f], away_goals[f] = score[::-1] if swapped else score
+        elif score[0] != score[1]:
+            knockout.append((h, a) if score[0] > score[1] else (a, h))
+
+    return (played, home_goals, away_goals), knockout
+
+def sample_scores(probs, home_idx, away_idx, size, rng, score_params):
+    """
+    Samples scorelines for `size` runs of the given fixtures. The outcome of
+    each match follows the matchup probabilities; goals are then drawn to
+    fit the outcome. Returns (size, n_matches) home and away goal arrays.
+    """
+    p = probs[home_idx, away_idx]
+    u = rng.random((size, len(home_idx)))
+    home_win = u < p[:, 0]
+    draw = ~home_win & (u < p[:, 0] + p[:, 1])
+
+    shape = u.shape
+    loser_goals = rng.poisson(score_params['loser_goals'], shape)
+    winner_goals = loser_goals + 1 + rng.poisson(score_params['win_margin'], shape)
+    draw_goals = rng.poisson(score_params['draw_goals'], shape)
+
+    home_goals = np.where(draw, draw_goals, np.where(home_win, winner_goals, loser_goals))
+    away_goals = np.where(draw, draw_goals, np.where(home_win, loser_goals, winner_goals))
+    return home_goals, away_goals
+
+def group_tables(home_goals, away_goals, home_idx, away_idx, n_teams, counted=None):
+    """
+    Points, goal difference and goals scored per team for every run, from
+    the matches where `counted` (same shape as the goals) is true, or from
+    all of them.
+    """
+    home_onehot = np.eye(n_teams)[home_idx]
+    away_onehot = np.eye(n_teams)[away_idx]
+
+    home_points = np.where(home_goals > away_goals, 3.0, np.where(home_goals == away_goals, 1.0, 0.0))
+    away_points = np.where(away_goals > home_goals, 3.0, np.where(home_goals == away_goals, 1.0, 0.0))
+    if counted is not None:
+        home_points, away_points = home_points * counted, away_points * counted
+        home_goals, away_goals = home_goals * counted, away_goals * counted
+
+    points = home_points @ home_onehot + away_points @ away_onehot
+    goals_for = home_goals @ home_onehot + away_goals @ away_onehot
+    goals_against = away_goals @ home_onehot + home_goals @ away_onehot
+    return points, goals_for - goals_against, goals_for
+
+def head_to_head(points, home_goals, away_goals, home_idx, away_idx):
+    """
+    Points, goal difference and goals scored per team in the matches
+    between teams level on points, for every run.
+    """
+    level = points[:, home_idx] == points[:, away_idx]
+    return group_tables(home_goals, away_goals, home_idx, away_idx, points.shape[1], counted=level)
+
+def rank_groups(points, goal_diff, goals_for, rng, h2h=None):
+    """
+    Orders the teams of each group by CAF's tiebreakers: points, then the
+    `h2h` (head_to_head) points, goal difference and goals scored among
+    the teams level on points, then overall goal difference and goals
+    scored, drawing lots for remaining ties. The head-to-head criteria are
+    applied once to all teams level on points, not re-applied to a subset
+    of them that is still level. Returns (size, n_groups, 4) team indices
+    from first to last place.
+    """
+    size, n_teams = points.shape
+    shape = (size, n_teams // 4, 4)
+    lots = rng.random(shape)
+
+    # lexsort uses the last key as primary; negate for descending order
+    keys = [lots, -goals_for.reshape(shape), -goal_diff.reshape(shape)]
+    if h2h is not None:
+        h2h_points, h2h_goal_diff, h2h_goals_for = h2h
+        keys += [-h2h_goals_for.reshape(shape), -h2h_goal_diff.reshape(shape), -h2h_points.reshape(shape)]
+    order = np.lexsort(keys + [-points.reshape(shape)], axis=-1)
+    return order + 4 * np.arange(n_teams // 4)[None, :, None]
+
+def r16_slots(placed, points, goal_diff, goals_for, rng, group_names):
+    """
+    Round of 16 bracket for every run from the group placings: the group
+    winners and runners-up plus the four best third-placed teams (by
+    points, goal difference and goals scored, as they played no common
+    matches), slotted through THIRD_PLACE_TABLE.
+    """
+    size, n_groups, _ = placed.shape
+    runs = np.arange(size)[:, None]
+    thirds = placed[:, :, 2]
+
+    # Best four third-placed teams, as a bitmask of their groups
+    lots = rng.random(thirds.shape)
+    third_order = np.lexsort((lots, -goals_for[runs, thirds], -goal_diff[runs, thirds], -points[runs, thirds]), axis=-1)
+    mask = np.zeros(size, dtype=np.int64)
+    for k in range(4):
+        mask |= 1 << third_order[:, k]
+
+    # Bitmask -> group of the third-placed opponent of the winners of A, B, C, D
+    group_pos = {name: g for g, name in enumerate(group_names)}
+    lookup = np.full((1 << n_groups, 4), -1)
+    for qualified, opponents in THIRD_PLACE_TABLE.items():
+        bits = sum(1 << group_pos[name] for name in qualified)
+        lookup[bits] = [group_pos[name] for name in opponents]
+    third_groups = lookup[mask]
+
+    slots = np.empty((size, len(R16_LAYOUT)), dtype=np.int64)
+    for s, (place, group) in enumerate(R16_LAYOUT):
+        g = group_pos[group]
+        if place == '3':
+            slots[:, s] = thirds[runs[:, 0], third_groups[:, 'ABCD'.index(group)]]
+        else:
+            slots[:, s] = placed[:, g, int(place) - 1]
+    return slots
+
+def simulate_group_stage(probs, groups, size, rng, score_params, played=None, scoreline_cdf=None):
+    """
+    Simulates the group stage `size` times at once. `probs` is the matchup
+    tensor over the teams of `groups` in order; `played` (see
+    locked_results) fixes the scores of matches already played. With a
+    `scoreline_cdf` from the goal model, scores are drawn from its
+    scoreline matrices instead of from `probs` and `score_params`. Returns
+    the (size, 16) round of 16 brackets and the (size, n_groups, 4) group
+    placings.
+    """
+    home_idx, away_idx = group_fixtures(groups)
+    if scoreline_cdf is not None:
+        home_goals, away_goals = sample_scorelines(scoreline_cdf, home_idx, away_idx, size, rng)
+    else:
+        home_goals, away_goals = sample_scores(probs, home_idx, away_idx, size, rng, score_params)
+
+    if played is not None:
+        mask, played_home, played_away = played
+        home_goals = np.where(mask, played_home, home_goals)
+        away_goals = np.where(mask, played_away, away_goals)
+
+    points, goal_diff, goals_for = group_tables(home_goals, away_goals, home_idx, away_idx, 4 * len(groups))
+    h2h = head_to_head(points, home_goals, away_goals, home_idx, away_idx)
+    placed = rank_groups(points, goal_diff, goals_for, rng, h2h)
+    slots = r16_slots(placed, points, goal_diff, goals_for, rng, list(groups))
+    return slots, placed
+
+def simulate_from_groups(probs, groups, n_simulations, rng, score_params, draw_home_share=0.5,
+                         played=None, knockout=(), scoreline_cdf=None):
+    """
+    Plays n_simulations full tournaments in chunks of CHUNK_SIZE, keeping
+    the `played` group scores and `knockout` (winner, loser) results fixed;
+    `scoreline_cdf` is passed on to simulate_group_stage.
+    Returns how often each team reached the round of 16 and the per-round
+    knockout counts of play_knockout.
+    """
+    n_teams = probs.shape[0]
+    advance = advance_matrix(probs, draw_home_share)
+    for winner, loser in knockout:
+        advance[winner, loser], advance[loser, winner] = 1.0, 0.0
+
+    r16_counts = np.zeros(n_teams, dtype=np.int64)
+    knockout_counts = np.zeros((len(R16_LAYOUT).bit_length() - 1, n_teams), dtype=np.int64)
+    for start in range(0, n_simulations, CHUNK_SIZE):
+        size = min(CHUNK_SIZE, n_simulations - start)
+        slots, _ = simulate_group_stage(probs, groups, size, rng, score_params, played, scoreline_cdf)
+        r16_counts += np.bincount(slots.ravel(), minlength=n_teams)
+        knockout_counts += play_knockout(advance, slots, rng)
+
+    return r16_counts, knockout_counts
@@ -0,0 +1,109 @@
+import os
+import time
+import numpy as np
+import xgboost as xgb
+from concurrent.futures import ProcessPoolExecutor
+from sklearn.metrics import log_loss
+from sklearn.model_selection import TimeSeriesSplit
+from src.features.schema import load_dataset, MATCH_FEATURES
+from src.models.evaluate import calculate_rps
+
+# Native xgboost parameters shared by every trial
+BASE_PARAMS = {
+    'objective': 'multi:softprob',
+    'num_class': 3,
+    'seed': 42,
+    'nthread': 1
+}
+
+# Validation objectives, lower is better
+METRICS = {
+    'mlogloss': lambda y, prob: log_loss(y, prob, labels=[0, 1, 2]),
+    'rps': calculate_rps
+}
+
+# Fold DMatrices built once per worker process, reused by all its trials
+_folds = []
+
+def fold_ranges(n_rows, n_splits=5):
+    """
+    (train stop, valid start, valid stop) row bounds of TimeSeriesSplit
+    folds over date-ordered rows; every fold trains on rows [0, stop).
+    """
+    folds = []
+    for train_idx, valid_idx in TimeSeriesSplit(n_splits=n_splits).split(np.empty(n_rows)):
+        folds.append((int(train_idx[-1]) + 1, int(valid_idx[0]), int(valid_idx[-1]) + 1))
+    return folds
+
+def _build_folds(ranges):
+    data = load_dataset()
+    X, y = data['X'][data['train']], data['y'][data['train']]
+    _folds.clear()
+    for train_stop, valid_start, valid_stop in ranges:
+        _folds.append((
+            xgb.DMatrix(X[:train_stop], label=y[:train_stop], feature_names=MATCH_FEATURES),
+            xgb.DMatrix(X[valid_start:valid_stop], feature_names=MATCH_FEATURES),
+            np.asarray(y[valid_start:valid_stop])
+        ))
+
+def _run_trial(params, rounds, boosters, metric):
+    """
+    Trains one candidate to `rounds` boosting rounds on every fold,
+    continuing from the boosters of its previous rung when given (as raw
+    bytes). Returns (mean validation score, boosters, seconds).
+    """
+    start = time.perf_counter()
+    scores, trained = [], []
+    for k, (dtrain, dvalid, y_valid) in enumerate(_folds):
+        previous = None
+        done = 0
+        if boosters is not None:
+            previous = xgb.Booster(model_file=bytearray(boosters[k]))
+            done = previous.num_boosted_rounds()
+        booster = xgb.train({**BASE_PARAMS, **params}, dtrain, num_boost_round=rounds - done, xgb_model=previous)
+        scores.append(METRICS[metric](y_valid, booster.predict(dvalid)))
+        trained.append(bytes(booster.save_raw()))
+    return float(np.mean(scores)), trained, time.perf_counter() - start
+
+def successive_halving(candidates, min_rounds=25, max_rounds=675, eta=3, metric='mlogloss',
+                       n_splits=5, max_workers=None, log=None):
+    """
+    Successive halving over `candidates` (dicts of native xgboost
+    parameters), with boosting rounds as the budget: every rung trains the
+    surviving candidates to eta times more rounds than the last, continuing
+    their fold boosters, and keeps the best 1/eta by mean validation
+    `metric`. Trials run on a process pool whose workers build the fold
+    DMatrices once. Every trial is passed to `log` as a dict. Returns the
+    best (params, rounds, score) seen at any rung, since more rounds can
+    overfit.
+    """
+    ranges = fold_ranges(load_dataset()['train'].stop, n_splits)
+    max_workers = max_workers or os.cpu_count()
+
+    survivors = list(range(len(candidates)))
+    boosters = [None] * len(candidates)
+    rounds, rung = min_rounds, 0
+    best = (None, None, np.inf)
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_build_folds, initargs=(ranges,)) as executor:
+        while True:
+            futures = [executor.submit(_run_trial, candidates[i], rounds, boosters[i], metric) for i in survivors]
+            scores = {}
+            for i, future in zip(survivors, futures):
+                score, boosters[i], seconds = future.result()
+                scores[i] = score
+                if score < best[2]:
+                    best = (candidates[i], rounds, score)
+                if log is not None:
+                    log({'rung': rung, 'candidate': i, 'rounds': rounds, metric: score, 'seconds': seconds, **candidates[i]})
+
+            ranked = sorted(survivors, key=scores.get)
+            keep = max(1, len(survivors) // eta)
+            if keep == 1 or rounds * eta > max_rounds:
+                return best
+
+            # Boosters of eliminated candidates are no longer needed
+            for i in ranked[keep:]:
+                boosters[i] = None
+            survivors = ranked[:keep]
+            rounds *= eta
+            rung += 1
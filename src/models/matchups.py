@@ -0,0 +1,90 @@
+import pandas as pd
+import numpy as np
+from src.features.team_store import TEAM_STATE_FIELDS
+from src.features.schema import MATCH_FEATURES
+
+# Match context used for tournament matchups (neutral AFCON venue, no H2H)
+DEFAULT_CONTEXT = {
+    'h2h_win_rate': 0.5, # Simplified for simulation
+    'h2h_game_count': 0,
+    'is_home_adv': 0,
+    'is_neutral': 1,
+    'tournament_weight': 8 # AFCON weight
+}
+
+# Probabilities used when a team has no recorded state
+DEFAULT_PROBS = [0.33, 0.34, 0.33]
+
+def pair_features(home, away, context=None):
+    """
+    Feature block for a batch of matchups. `home` and `away` map each
+    TEAM_STATE_FIELDS name to an array with one entry per matchup.
+    Returns a float array with columns in MATCH_FEATURES order.
+    """
+    context = {**DEFAULT_CONTEXT, **(context or {})}
+    n = len(home['rank'])
+
+    columns = {
+        'home_rank': home['rank'],
+        'away_rank': away['rank'],
+        'home_points': home['points'],
+        'away_points': away['points'],
+        'home_form': home['form'],
+        'away_form': away['form'],
+        'home_weighted_form': home['weighted_form'],
+        'away_weighted_form': away['weighted_form'],
+        'home_goal_diff_form': home['goal_diff_form'],
+        'away_goal_diff_form': away['goal_diff_form'],
+        'rank_diff': home['rank'] - away['rank'],
+        'point_diff': home['points'] - away['points'],
+        'home_rank_momentum': home['rank_momentum'],
+        'away_rank_momentum': away['rank_momentum'],
+        'home_elo': home['elo'],
+        'away_elo': away['elo'],
+        'elo_diff': home['elo'] - away['elo'],
+        'home_travel_dist': home['travel_dist'],
+        'away_travel_dist': away['travel_dist'],
+        'home_squad_value': home['squad_value'],
+        'away_squad_value': away['squad_value'],
+        'home_squad_quality': home['squad_quality'],
+        'away_squad_quality': away['squad_quality'],
+        'log_home_value': home['log_value'],
+        'log_away_value': away['log_value'],
+        'value_diff': home['squad_value'] - away['squad_value'],
+        'value_ratio': home['squad_value'] / (away['squad_value'] + 1e-6),
+        'quality_diff': home['squad_quality'] - away['squad_quality']
+    }
+
+    block = np.empty((n, len(MATCH_FEATURES)))
+    for k, name in enumerate(MATCH_FEATURES):
+        block[:, k] = columns[name] if name in columns else context[name]
+    return block
+
+def build_matchup_matrix(teams, model, store, context=None):
+    """
+    Outcome probabilities for every ordered pair of `teams`, scored in a
+    single predict_proba call. Returns an N x N x 3 array where [i, j] holds
+    [home win, draw, away win] for teams[i] hosting teams[j]; the diagonal
+    is NaN.
+    """
+    n = len(teams)
+    states = store.reindex(teams)
+    known = store.index.get_indexer(teams) >= 0
+
+    home_idx, away_idx = np.nonzero(~np.eye(n, dtype=bool))
+    fields = {field: states[field].to_numpy(dtype=float) for field in TEAM_STATE_FIELDS}
+    home = {field: values[home_idx] for field, values in fields.items()}
+    away = {field: values[away_idx] for field, values in fields.items()}
+
+    probs = np.full((n, n, 3), np.nan)
+    if len(home_idx) > 0:
+        X = pd.DataFrame(pair_features(home, away, context), columns=MATCH_FEATURES)
+        pair_probs = model.predict_proba(X).astype(float)
+        # Renormalize in float64 so rows sum to 1 for sampling
+        probs[home_idx, away_idx] = pair_probs / pair_probs.sum(axis=1, keepdims=True)
+
+    # Teams without a recorded state get the uninformed default
+    missing = ~(known[home_idx] & known[away_idx])
+    probs[home_idx[missing], away_idx[missing]] = DEFAULT_PROBS
+
+    return probs
@@ -0,0 +1,104 @@
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from multiprocessing import shared_memory
+from src.models.bracket import simulate_bracket
+from src.models.group_stage import simulate_from_groups
+
+# Matchup tensor attached by each worker process
+_shared = {}
+
+def _attach_probs(name, shape, dtype):
+    shm = shared_memory.SharedMemory(name=name)
+    _shared['shm'] = shm
+    _shared['probs'] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+def _run_shard(seed_seq, size, slots, groups, score_params, draw_home_share, options):
+    """
+    Plays one shard of simulations against the shared matchup tensor.
+    Returns an (n_rounds + 1, N) array: row 0 counts first-round
+    appearances, the remaining rows the per-round knockout wins.
+    """
+    probs = _shared['probs']
+    rng = np.random.default_rng(seed_seq)
+
+    if groups is not None:
+        first_round, counts = simulate_from_groups(probs, groups, size, rng, score_params, draw_home_share, **options)
+    else:
+        counts = simulate_bracket(probs, slots, size, rng, draw_home_share)
+        first_round = np.bincount(slots, minlength=probs.shape[0]) * size
+    return np.vstack([first_round, counts])
+
+def winner_std_error(counts, n_simulations):
+    """
+    Largest standard error of the per-team winner probabilities.
+    """
+    p = counts[-1] / n_simulations
+    return np.sqrt(p * (1 - p) / n_simulations).max()
+
+def simulate_parallel(probs, n_simulations, slots=None, groups=None, score_params=None, seed=None,
+                      n_shards=8, max_workers=None, draw_home_share=0.5, target_se=None, options=None):
+    """
+    Splits n_simulations into n_shards and plays them in a process pool.
+    Either a fixed bracket (`slots`) or a full tournament from `groups` is
+    simulated; `options` holds further keyword arguments of
+    simulate_from_groups (locked results, scoreline CDFs). Each shard draws
+    from its own stream spawned from `seed`, and the matchup tensor is
+    shared between workers through shared memory.
+
+    Shards are merged in order, so the result is bit-identical for a given
+    seed and shard count. With `target_se`, the run stops at the first
+    shard prefix whose winner-probability standard error is below the
+    target, checked after every merged shard. Shards are submitted in waves
+    of one per worker, so converging early skips every shard not yet
+    started; shards already running are finished and discarded. Returns the
+    merged counts and the number of simulations they cover.
+    """
+    if (slots is None) == (groups is None):
+        raise ValueError("Pass exactly one of slots or groups")
+    slots = np.asarray(slots) if slots is not None else None
+
+    seeds = np.random.SeedSequence(seed).spawn(n_shards)
+    sizes = [n_simulations // n_shards + (k < n_simulations % n_shards) for k in range(n_shards)]
+
+    probs = np.ascontiguousarray(probs, dtype=np.float64)
+    shm = shared_memory.SharedMemory(create=True, size=probs.nbytes)
+    try:
+        np.ndarray(probs.shape, dtype=probs.dtype, buffer=shm.buf)[:] = probs
+
+        n_workers = max_workers or os.cpu_count()
+        with ProcessPoolExecutor(n_workers, initializer=_attach_probs,
+                                 initargs=(shm.name, probs.shape, probs.dtype)) as pool:
+            def submit(k):
+                return pool.submit(_run_shard, seeds[k], sizes[k], slots, groups, score_params, draw_home_share, options or {})
+
+            # Keep at most one shard per worker in flight, so a converged
+            # run leaves no queue of shards behind it
+            running = {submit(k): k for k in range(min(n_workers, n_shards))}
+            submitted = len(running)
+
+            counts, done, merged, converged = None, {}, 0, False
+            while running and not converged:
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    done[running.pop(future)] = future.result()
+
+                # Merge the contiguous prefix of finished shards, checking
+                # convergence after each one
+                while merged in done:
+                    shard = done.pop(merged)
+                    counts = shard if counts is None else counts + shard
+                    merged += 1
+                    if target_se is not None and winner_std_error(counts, sum(sizes[:merged])) < target_se:
+                        print(f"Converged after {sum(sizes[:merged])} simulations ({merged}/{n_shards} shards)")
+                        converged = True
+                        break
+
+                while not converged and submitted < n_shards and len(running) < n_workers:
+                    running[submit(submitted)] = submitted
+                    submitted += 1
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return counts, sum(sizes[:merged])
@@ -1,10 +1,8 @@
 import pandas as pd
-import pickle
-from src.config import XGB_MODEL_PATH
+from src.models.registry import get_model
 
 def predict_match(home_team, away_team, features_dict):
-    with open(XGB_MODEL_PATH, 'rb') as f:
-        model = pickle.load(f)
+    model = get_model('xgb')
     
     # features_dict should contain the necessary features for the prediction
     X = pd.DataFrame([features_dict])
@@ -1,6 +1,8 @@
 import pandas as pd
-import pickle
-from src.config import XGB_MODEL_PATH, FEATURES_TABLE, EXTERNAL_DATA_DIR
+from src.config import FEATURES_TABLE, EXTERNAL_DATA_DIR
+from src.models.registry import get_model
+from src.features.schema import MATCH_FEATURES
+from src.data.storage import load_table
 from src.features.form_features import calculate_form
 from src.features.h2h_features import calculate_h2h
 from src.features.fifa_features import calculate_fifa_features
@@ -10,15 +12,14 @@ from src.features.travel_features import calculate_travel_distance
 
 def predict_afcon_2025():
     # Load model
-    with open(XGB_MODEL_PATH, 'rb') as f:
-        model = pickle.load(f)
+    model = get_model('xgb')
     
     # Load fixtures
     fixtures = pd.read_csv(EXTERNAL_DATA_DIR / "afcon_2025_fixtures.csv")
     fixtures['date'] = pd.to_datetime(fixtures['date'])
     
     # Load historical data to calculate features
-    historical_df = pd.read_csv(FEATURES_TABLE)
+    historical_df = load_table(FEATURES_TABLE, categorical=False)
     historical_df['date'] = pd.to_datetime(historical_df['date'])
     
     # Combine fixtures with historical data to calculate rolling features
@@ -35,14 +36,7 @@ def predict_afcon_2025():
     # Filter back to just the fixtures
     prediction_df = combined_df[combined_df['home_score'].isna()].copy()
     
-    features = [
-        'home_rank', 'away_rank', 'home_points', 'away_points', 
-        'home_form', 'away_form', 'home_weighted_form', 'away_weighted_form',
-        'home_goal_diff_form', 'away_goal_diff_form',
-        'rank_diff', 'point_diff', 'home_rank_momentum', 'away_rank_momentum',
-        'h2h_win_rate', 'h2h_game_count', 'is_home_adv', 'is_neutral', 'tournament_weight',
-        'home_elo', 'away_elo', 'elo_diff', 'home_travel_dist', 'away_travel_dist'
-    ]
+    features = MATCH_FEATURES
     
     # Ensure all features exist and fill NaNs
     for col in features:
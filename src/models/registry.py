@@ -0,0 +1,110 @@
+import os
+import pickle
+import hashlib
+import threading
+from src.config import MODEL_VERSIONS_DIR, XGB_MODEL_PATH, BASELINE_MODEL_PATH, SCALER_PATH, GOAL_MODEL_PATH
+from src.models.tree_backend import NumpyTreeModel
+
+# Model name -> path of the current artifact
+MODEL_PATHS = {
+    'xgb': XGB_MODEL_PATH,
+    'baseline': BASELINE_MODEL_PATH,
+    'scaler': SCALER_PATH,
+    'goal_model': GOAL_MODEL_PATH
+}
+
+# name -> {'model', 'version', 'stat'}; entries are replaced, never mutated,
+# so a caller holding an entry keeps a consistent model/version pair
+_cache = {}
+_lock = threading.Lock()
+
+# Inference backends: 'xgboost' serves the unpickled model itself, 'numpy'
+# its exported trees (see tree_backend)
+BACKENDS = ('xgboost', 'numpy')
+
+# name -> entry holding the NumpyTreeModel export of a cached model
+_compiled = {}
+
+def _stat(path):
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+def save_model(name, model):
+    """
+    Saves a model as a new version: a content-addressed copy under
+    models/versions/ and an atomic replace of the current artifact.
+    Returns the version id.
+    """
+    data = pickle.dumps(model)
+    version = hashlib.sha1(data).hexdigest()[:12]
+
+    versioned = MODEL_VERSIONS_DIR / f"{name}-{version}.pkl"
+    if not versioned.exists():
+        versioned.write_bytes(data)
+
+    # Write then rename, so readers never see a partially written file
+    path = MODEL_PATHS[name]
+    tmp = path.with_suffix(path.suffix + '.tmp')
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    return version
+
+def _load(name):
+    path = MODEL_PATHS[name]
+    stat = _stat(path)
+    data = path.read_bytes()
+    return {
+        'model': pickle.loads(data),
+        'version': hashlib.sha1(data).hexdigest()[:12],
+        'stat': stat
+    }
+
+def _compiled_entry(name, entry):
+    compiled = _compiled.get(name)
+    if compiled is None or compiled['version'] != entry['version']:
+        compiled = {**entry, 'model': NumpyTreeModel(entry['model'])}
+        _compiled[name] = compiled
+    return compiled
+
+def get_entry(name, refresh=False, backend='xgboost'):
+    """
+    Cached {'model', 'version'} entry of a model, loaded on first use. With
+    refresh=True the artifact is re-read if its file stat changed. With
+    backend='numpy' the model is the NumPy export of the same version.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend: {backend}")
+
+    entry = _cache.get(name)
+    if entry is None or (refresh and _stat(MODEL_PATHS[name]) != entry['stat']):
+        with _lock:
+            entry = _cache.get(name)
+            if entry is None or _stat(MODEL_PATHS[name]) != entry['stat']:
+                entry = _load(name)
+                _cache[name] = entry
+
+    return _compiled_entry(name, entry) if backend == 'numpy' else entry
+
+def get_model(name, refresh=False, backend='xgboost'):
+    return get_entry(name, refresh, backend)['model']
+
+def get_model_version(name):
+    return get_entry(name)['version']
+
+def refresh_models():
+    """
+    Reloads every cached model whose artifact changed on disk. Returns the
+    names of the reloaded models.
+    """
+    reloaded = []
+    for name, entry in list(_cache.items()):
+        if get_entry(name, refresh=True) is not entry:
+            reloaded.append(name)
+    return reloaded
+
+def list_versions(name):
+    """
+    Saved version ids of a model, oldest first.
+    """
+    paths = sorted(MODEL_VERSIONS_DIR.glob(f"{name}-*.pkl"), key=os.path.getmtime)
+    return [p.stem[len(name) + 1:] for p in paths]
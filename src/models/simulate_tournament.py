@@ -1,98 +1,27 @@
 import pandas as pd
 import numpy as np
-import pickle
 import os
-from src.config import XGB_MODEL_PATH, FEATURES_TABLE
+from src.config import MATCHES_CLEANED, ELO_STATE_PATH
+from src.models.registry import get_model
+from src.data.storage import load_table
+from src.data.load_data import load_tournament_results
+from src.features.elo_features import load_elo_state
+from src.features.team_store import load_team_store, update_team_store
+from src.models.matchups import build_matchup_matrix
+from src.models.bracket import simulate_bracket, exact_bracket, results_table
+from src.models.group_stage import AFCON_2025_GROUPS, fit_scoreline_params, locked_results, simulate_from_groups
+from src.models.parallel_sim import simulate_parallel
+from src.models.goal_model import load_goal_model, build_scoreline_tensor, scoreline_cdf, outcome_probs
 from src.features.form_features import calculate_form
 from src.features.h2h_features import calculate_h2h
 from src.features.fifa_features import calculate_fifa_features
 from src.features.context_features import calculate_context_features
 
-def get_team_features(team, historical_df):
-    # Get the latest features for a team
-    team_latest = historical_df[(historical_df['home_team'] == team) | (historical_df['away_team'] == team)].sort_values('date').tail(1)
-    if len(team_latest) == 0:
-        return None
-    
-    if team_latest.iloc[0]['home_team'] == team:
-        return {
-            'rank': team_latest.iloc[0]['home_rank'],
-            'points': team_latest.iloc[0]['home_points'],
-            'form': team_latest.iloc[0]['home_form'],
-            'weighted_form': team_latest.iloc[0]['home_weighted_form'],
-            'goal_diff_form': team_latest.iloc[0]['home_goal_diff_form'],
-            'rank_momentum': team_latest.iloc[0]['home_rank_momentum'],
-            'elo': team_latest.iloc[0]['home_elo'],
-            'travel_dist': team_latest.iloc[0]['home_travel_dist'],
-            'squad_value': team_latest.iloc[0]['home_squad_value'],
-            'squad_quality': team_latest.iloc[0]['home_squad_quality'],
-            'log_value': team_latest.iloc[0]['log_home_value']
-        }
-    else:
-        return {
-            'rank': team_latest.iloc[0]['away_rank'],
-            'points': team_latest.iloc[0]['away_points'],
-            'form': team_latest.iloc[0]['away_form'],
-            'weighted_form': team_latest.iloc[0]['away_weighted_form'],
-            'goal_diff_form': team_latest.iloc[0]['away_goal_diff_form'],
-            'rank_momentum': team_latest.iloc[0]['away_rank_momentum'],
-            'elo': team_latest.iloc[0]['away_elo'],
-            'travel_dist': team_latest.iloc[0]['away_travel_dist'],
-            'squad_value': team_latest.iloc[0]['away_squad_value'],
-            'squad_quality': team_latest.iloc[0]['away_squad_quality'],
-            'log_value': team_latest.iloc[0]['log_away_value']
-        }
-
-def get_match_probs_fast(home_team, away_team, model, team_features):
-    home_feats = team_features.get(home_team)
-    away_feats = team_features.get(away_team)
-    
-    if not home_feats or not away_feats:
-        return [0.33, 0.34, 0.33]
-    
-    # Construct feature vector
-    match_feats = {
-        'home_rank': home_feats['rank'],
-        'away_rank': away_feats['rank'],
-        'home_points': home_feats['points'],
-        'away_points': away_feats['points'],
-        'home_form': home_feats['form'],
-        'away_form': away_feats['form'],
-        'home_weighted_form': home_feats['weighted_form'],
-        'away_weighted_form': away_feats['weighted_form'],
-        'home_goal_diff_form': home_feats['goal_diff_form'],
-        'away_goal_diff_form': away_feats['goal_diff_form'],
-        'rank_diff': home_feats['rank'] - away_feats['rank'],
-        'point_diff': home_feats['points'] - away_feats['points'],
-        'home_rank_momentum': home_feats['rank_momentum'],
-        'away_rank_momentum': away_feats['rank_momentum'],
-        'h2h_win_rate': 0.5, # Simplified for simulation
-        'h2h_game_count': 0,
-        'is_home_adv': 0,
-        'is_neutral': 1,
-        'tournament_weight': 8, # AFCON weight
-        'home_elo': home_feats['elo'],
-        'away_elo': away_feats['elo'],
-        'elo_diff': home_feats['elo'] - away_feats['elo'],
-        'home_travel_dist': home_feats['travel_dist'],
-        'away_travel_dist': away_feats['travel_dist'],
-        'home_squad_value': home_feats['squad_value'],
-        'away_squad_value': away_feats['squad_value'],
-        'home_squad_quality': home_feats['squad_quality'],
-        'away_squad_quality': away_feats['squad_quality'],
-        'log_home_value': home_feats['log_value'],
-        'log_away_value': away_feats['log_value'],
-        'value_diff': home_feats['squad_value'] - away_feats['squad_value'],
-        'value_ratio': home_feats['squad_value'] / (away_feats['squad_value'] + 1e-6),
-        'quality_diff': home_feats['squad_quality'] - away_feats['squad_quality']
-    }
-    
-    X = pd.DataFrame([match_feats])
-    probs = model.predict_proba(X)[0]
-    return probs
+def get_match_probs_fast(home_team, away_team, model, store):
+    return build_matchup_matrix([home_team, away_team], model, store)[0, 1]
 
-def simulate_match(home_team, away_team, model, team_features):
-    probs = get_match_probs_fast(home_team, away_team, model, team_features)
+def simulate_match(home_team, away_team, model, store):
+    probs = get_match_probs_fast(home_team, away_team, model, store)
     outcome = np.random.choice(['home', 'draw', 'away'], p=probs)
     
     if outcome == 'home':
@@ -102,96 +31,135 @@ def simulate_match(home_team, away_team, model, team_features):
     else:
         return np.random.choice([home_team, away_team])
 
-def simulate_tournament():
-    with open(XGB_MODEL_PATH, 'rb') as f:
-        model = pickle.load(f)
-    
-    historical_df = pd.read_csv(FEATURES_TABLE)
-    historical_df['date'] = pd.to_datetime(historical_df['date'])
-    
-    # Round of 16 Matchups
-    r16_matches = [
-        ("Senegal", "Sudan"),
-        ("Mali", "Tunisia"),
-        ("Morocco", "Tanzania"),
-        ("South Africa", "Cameroon"),
-        ("Egypt", "Benin"),
-        ("Nigeria", "Mozambique"),
-        ("Algeria", "DR Congo"),
-        ("Burkina Faso", "Ivory Coast")
-    ]
-    
-    all_teams = list(set([t for m in r16_matches for t in m]))
-    
-    # Pre-calculate latest features for all teams
-    print("Pre-calculating team features...")
-    team_features = {}
-    for team in all_teams:
-        feats = get_team_features(team, historical_df)
-        if feats:
-            team_features[team] = feats
+# Round of 16 Matchups
+R16_MATCHES = [
+    ("Senegal", "Sudan"),
+    ("Mali", "Tunisia"),
+    ("Morocco", "Tanzania"),
+    ("South Africa", "Cameroon"),
+    ("Egypt", "Benin"),
+    ("Nigeria", "Mozambique"),
+    ("Algeria", "DR Congo"),
+    ("Burkina Faso", "Ivory Coast")
+]
+
+def simulate_tournament(n_simulations=10000, seed=None, mode='monte_carlo', draw_home_share=0.5,
+                        n_shards=8, max_workers=None, target_se=None, backend='xgboost'):
+    """
+    Knockout-stage probabilities for the R16 bracket. mode='monte_carlo'
+    samples n_simulations tournaments; mode='exact' computes the same table
+    without sampling noise; mode='parallel' samples in n_shards processes
+    and, with target_se, stops once the winner probabilities are that
+    precise. A drawn match goes to the home side with probability
+    draw_home_share (0.5 is a coin flip). `backend` selects the model's
+    inference backend ('xgboost' or 'numpy').
+    """
+    if mode not in ('monte_carlo', 'exact', 'parallel'):
+        raise ValueError(f"Unknown simulation mode: {mode}")
+    
+    model = get_model('xgb', backend=backend)
+    
+    store = load_team_store()
+    
+    # Bracket slots in R16 order; slots 2k and 2k + 1 meet
+    all_teams = [t for m in R16_MATCHES for t in m]
+    slots = np.arange(len(all_teams))
     
     # Pre-calculate all possible match probabilities to speed up simulation
     print("Pre-calculating match probabilities...")
-    match_probs = {}
-    for t1 in all_teams:
-        for t2 in all_teams:
-            if t1 == t2: continue
-            match_probs[(t1, t2)] = get_match_probs_fast(t1, t2, model, team_features)
+    match_probs = build_matchup_matrix(all_teams, model, store)
+    
+    if mode == 'exact':
+        print("Computing exact bracket probabilities...")
+        results = results_table(all_teams, exact_bracket(match_probs, slots, draw_home_share), 1)
+    elif mode == 'parallel':
+        print(f"Simulating tournament {n_simulations} times in {n_shards} shards...")
+        counts, n_done = simulate_parallel(match_probs, n_simulations, slots=slots, seed=seed, n_shards=n_shards,
+                                           max_workers=max_workers, draw_home_share=draw_home_share, target_se=target_se)
+        results = results_table(all_teams, counts[1:], n_done)
+    else:
+        print(f"Simulating tournament {n_simulations} times...")
+        rng = np.random.default_rng(seed)
+        counts = simulate_bracket(match_probs, slots, n_simulations, rng, draw_home_share)
+        results = results_table(all_teams, counts, n_simulations)
+    
+    print("\nTournament Simulation Results:")
+    print(results.to_string(index=False))
+    
+    # Save results for dashboard
+    os.makedirs("data/processed", exist_ok=True)
+    results.to_csv("data/processed/simulation_results.csv", index=False)
+    print(f"\nResults saved to data/processed/simulation_results.csv")
+    
+    return results
 
-    def simulate_match_fast(t1, t2):
-        probs = match_probs.get((t1, t2), [0.33, 0.34, 0.33])
-        outcome = np.random.choice(['home', 'draw', 'away'], p=probs)
-        if outcome == 'home': return t1
-        if outcome == 'away': return t2
-        return np.random.choice([t1, t2])
+def simulate_full_tournament(n_simulations=100000, seed=None, groups=AFCON_2025_GROUPS, draw_home_share=0.5,
+                             n_shards=None, max_workers=None, target_se=None, conditional=False, results=None,
+                             score_model='outcome', backend='xgboost'):
+    """
+    Simulates the whole tournament from the group stage: group scorelines,
+    standings, the four best third-placed teams and the resulting R16
+    bracket, then the knockouts. Every run is processed in batched array
+    operations; with n_shards the runs are spread over a process pool.
 
-    n_simulations = 10000
-    win_counts = {team: 0 for team in all_teams}
-    final_counts = {team: 0 for team in all_teams}
-    sf_counts = {team: 0 for team in all_teams}
-    qf_counts = {team: 0 for team in all_teams}
+    With conditional=True the completed matches (`results`, by default the
+    AFCON 2025 results file) are locked in and only the remaining fixtures
+    are simulated, with team Elo and form moved forward to the latest
+    result.
+
+    score_model='outcome' plays every match from the match model, drawing
+    group scorelines to fit the sampled outcomes; score_model='goals'
+    plays every match from the Dixon-Coles goal model instead: group
+    scorelines are sampled from its cached scoreline matrices and knockout
+    outcomes from the same matrices, so one forecast never mixes the two
+    models. `backend` selects the match model's inference backend
+    ('xgboost' or 'numpy').
+    """
+    if score_model not in ('outcome', 'goals'):
+        raise ValueError(f"Unknown score model: {score_model}")
+    
+    store = load_team_store()
+    matches = load_table(MATCHES_CLEANED, categorical=False)
+    
+    all_teams = [t for g in groups.values() for t in g]
+    
+    options = {}
+    if conditional:
+        results = results if results is not None else load_tournament_results()
+        store = update_team_store(store, all_teams, matches, results, load_elo_state(ELO_STATE_PATH))
+        played, knockout = locked_results(groups, results)
+        options.update(played=played, knockout=knockout)
+        print(f"Locked {played[0].sum()} group and {len(knockout)} knockout results")
+    
+    print("Pre-calculating match probabilities...")
+    if score_model == 'goals':
+        # Knockout outcomes come from the same scoreline matrices as the
+        # group scores
+        tensor = build_scoreline_tensor(all_teams, load_goal_model())
+        match_probs = outcome_probs(tensor)
+        options['scoreline_cdf'] = scoreline_cdf(tensor)
+    else:
+        match_probs = build_matchup_matrix(all_teams, get_model('xgb', backend=backend), store)
+    
+    # Scoreline parameters fitted on past AFCON matches
+    score_params = fit_scoreline_params(matches[matches['tournament'] == 'African Cup of Nations'])
     
     print(f"Simulating tournament {n_simulations} times...")
+    if n_shards:
+        counts, n_simulations = simulate_parallel(match_probs, n_simulations, groups=groups, score_params=score_params,
+                                                  seed=seed, n_shards=n_shards, max_workers=max_workers,
+                                                  draw_home_share=draw_home_share, target_se=target_se, options=options)
+        r16_counts, knockout_counts = counts[0], counts[1:]
+    else:
+        rng = np.random.default_rng(seed)
+        r16_counts, knockout_counts = simulate_from_groups(match_probs, groups, n_simulations, rng, score_params, draw_home_share, **options)
     
-    for _ in range(n_simulations):
-        # Round of 16
-        r16_winners = [simulate_match_fast(m[0], m[1]) for m in r16_matches]
-        for w in r16_winners: qf_counts[w] += 1
-        
-        # Quarter-finals
-        qf_winners = [
-            simulate_match_fast(r16_winners[0], r16_winners[1]),
-            simulate_match_fast(r16_winners[2], r16_winners[3]),
-            simulate_match_fast(r16_winners[4], r16_winners[5]),
-            simulate_match_fast(r16_winners[6], r16_winners[7])
-        ]
-        for w in qf_winners: sf_counts[w] += 1
-        
-        # Semi-finals
-        sf_winners = [
-            simulate_match_fast(qf_winners[0], qf_winners[1]),
-            simulate_match_fast(qf_winners[2], qf_winners[3])
-        ]
-        for w in sf_winners: final_counts[w] += 1
-        
-        # Final
-        winner = simulate_match_fast(sf_winners[0], sf_winners[1])
-        win_counts[winner] += 1
-    
-    # Results
-    results = pd.DataFrame({
-        'Team': all_teams,
-        'QF Prob': [qf_counts[t]/n_simulations for t in all_teams],
-        'SF Prob': [sf_counts[t]/n_simulations for t in all_teams],
-        'Final Prob': [final_counts[t]/n_simulations for t in all_teams],
-        'Winner Prob': [win_counts[t]/n_simulations for t in all_teams]
-    }).sort_values('Winner Prob', ascending=False)
+    results = results_table(all_teams, knockout_counts, n_simulations)
+    results.insert(1, 'R16 Prob', r16_counts[results.index] / n_simulations)
     
     print("\nTournament Simulation Results:")
     print(results.to_string(index=False))
     
-    # Save results for dashboard
     os.makedirs("data/processed", exist_ok=True)
     results.to_csv("data/processed/simulation_results.csv", index=False)
     print(f"\nResults saved to data/processed/simulation_results.csv")
@@ -1,60 +1,36 @@
-import pandas as pd
 import xgboost as xgb
-import pickle
-from sklearn.model_selection import train_test_split
-from src.config import FEATURES_TABLE, XGB_MODEL_PATH
+from src.config import XGB_MODEL_PATH
+from src.features.schema import load_dataset, feature_frame
+from src.models.registry import save_model
+
+# Hyperparameters of the match model
+XGB_PARAMS = {
+    'n_estimators': 200,
+    'learning_rate': 0.01,
+    'max_depth': 3,
+    'subsample': 0.8,
+    'random_state': 42
+}
 
 def train_model():
-    df = pd.read_csv(FEATURES_TABLE)
-    
-    # Define target: 0 for Home Win, 1 for Draw, 2 for Away Win
-    df['target'] = 1 # Draw
-    df.loc[df['home_score'] > df['away_score'], 'target'] = 0 # Home Win
-    df.loc[df['home_score'] < df['away_score'], 'target'] = 2 # Away Win
-    
-    # Select features
-    features = [
-        'home_rank', 'away_rank', 'home_points', 'away_points', 
-        'home_form', 'away_form', 'home_weighted_form', 'away_weighted_form',
-        'home_goal_diff_form', 'away_goal_diff_form',
-        'rank_diff', 'point_diff', 'home_rank_momentum', 'away_rank_momentum',
-        'h2h_win_rate', 'h2h_game_count', 'is_home_adv', 'is_neutral', 'tournament_weight',
-        'home_elo', 'away_elo', 'elo_diff', 'home_travel_dist', 'away_travel_dist',
-        'home_squad_value', 'away_squad_value', 'home_squad_quality', 'away_squad_quality',
-        'log_home_value', 'log_away_value', 'value_diff', 'value_ratio', 'quality_diff'
-    ]
-    
-    # Drop rows with NaN in features (e.g., early matches with no FIFA rank)
-    df = df.dropna(subset=features)
-    
+    data = load_dataset()
+
     # Time-based split (train < 2024, test >= 2024)
-    df['date'] = pd.to_datetime(df['date'])
-    train_df = df[df['date'].dt.year < 2024]
-    test_df = df[df['date'].dt.year >= 2024]
-    
-    X_train = train_df[features]
-    y_train = train_df['target']
-    X_test = test_df[features]
-    y_test = test_df['target']
+    train, test = data['train'], data['test']
+    X_train = feature_frame(data['X'][train])
+    y_train = data['y'][train]
+    X_test = feature_frame(data['X'][test])
+    y_test = data['y'][test]
     
     print(f"Training on {len(X_train)} matches, testing on {len(X_test)} matches.")
     
-    model = xgb.XGBClassifier(
-        n_estimators=200, 
-        learning_rate=0.01, 
-        max_depth=3, 
-        subsample=0.8,
-        random_state=42,
-        use_label_encoder=False,
-        eval_metric='mlogloss'
-    )
+    model = xgb.XGBClassifier(**XGB_PARAMS, use_label_encoder=False, eval_metric='mlogloss')
     model.fit(X_train, y_train)
     
     # Save model
-    with open(XGB_MODEL_PATH, 'wb') as f:
-        pickle.dump(model, f)
+    version = save_model('xgb', model)
     
-    print(f"Model trained and saved to {XGB_MODEL_PATH}")
+    print(f"Model trained and saved to {XGB_MODEL_PATH} (version {version})")
     return model, X_test, y_test
 
 if __name__ == "__main__":
@@ -0,0 +1,146 @@
+import json
+import numpy as np
+import pandas as pd
+
+# Batches larger than this are handed to xgboost's multi-threaded predictor,
+# which overtakes the NumPy traversal on large inputs
+MAX_NUMPY_ROWS = 64
+
+def _tree_depth(tree):
+    parents = tree['parents']
+    depth = [0] * len(parents)
+    for i in range(1, len(parents)):
+        depth[i] = depth[parents[i]] + 1
+    return max(depth)
+
+def _fill_heap(tree, node, pos, level, depth, n_features, feature, threshold, value):
+    """
+    Writes the subtree rooted at `node` into complete-binary-tree (heap)
+    slots: internal slot p has children 2p + 1 and 2p + 2, and leaf slot l
+    holds the value reached there. Leaves above the full depth become
+    splits that always go left, with their value copied to every leaf
+    below them.
+    """
+    left = tree['left_children'][node]
+    if level == depth:
+        value[pos - (2 ** depth - 1)] = tree['split_conditions'][node]
+        return
+
+    if left == -1:
+        # Always-left dummy split: no value reaches +inf (missing values
+        # read as -inf through feature 0)
+        feature[pos], threshold[pos] = 0, np.inf
+        children = (node, node)
+    else:
+        # Missing values are encoded in the feature index, see ensemble_margins
+        feature[pos] = tree['split_indices'][node] + (0 if tree['default_left'][node] else n_features)
+        threshold[pos] = tree['split_conditions'][node]
+        children = (left, tree['right_children'][node])
+
+    for k, child in enumerate(children):
+        _fill_heap(tree, child, 2 * pos + 1 + k, level + 1, depth, n_features, feature, threshold, value)
+
+def export_booster(model):
+    """
+    Flattens a trained multi-class XGBClassifier into NumPy arrays. Every
+    tree is padded to a complete binary tree of the ensemble's depth, so
+    traversal is a fixed number of index updates, and trees are ordered by
+    class so class scores are contiguous sums.
+    """
+    learner = json.loads(model.get_booster().save_raw(raw_format='json'))['learner']
+    trees = learner['gradient_booster']['model']['trees']
+    tree_class = np.array(learner['gradient_booster']['model']['tree_info'])
+    n_features = int(learner['learner_model_param']['num_feature'])
+    n_classes = int(learner['learner_model_param']['num_class'])
+
+    depth = max(_tree_depth(tree) for tree in trees)
+    n_internal, n_leaves = 2 ** depth - 1, 2 ** depth
+
+    order = np.argsort(tree_class, kind='stable')
+    feature = np.zeros((len(trees), n_internal), dtype=np.intp)
+    threshold = np.zeros((len(trees), n_internal), dtype=np.float32)
+    value = np.zeros((len(trees), n_leaves))
+    for t, k in enumerate(order):
+        _fill_heap(trees[k], 0, 0, 0, depth, n_features, feature[t], threshold[t], value[t])
+
+    # Global index of each internal slot's left child; children on the last
+    # internal level point into the leaf value array instead
+    slots = np.arange(n_internal)
+    first_child = 2 * slots + 1
+    child_base = np.where(first_child < n_internal, first_child, first_child - n_internal)
+    bases = np.where(first_child < n_internal, n_internal, n_leaves)
+    child_base = (np.arange(len(trees))[:, None] * bases + child_base).astype(np.intp)
+
+    base_score = json.loads(learner['learner_model_param']['base_score'])
+    return {
+        'feature': feature.ravel(),
+        'threshold': threshold.ravel(),
+        'child_base': child_base.ravel(),
+        'value': value.ravel(),
+        'root_feature': feature[:, 0].copy(),
+        'root_threshold': threshold[:, 0].copy(),
+        'root_child_base': child_base[:, 0].copy(),
+        'class_starts': np.searchsorted(tree_class[order], np.arange(n_classes)),
+        'base_margin': np.atleast_1d(np.array(base_score, dtype=np.float64)),
+        'n_features': n_features,
+        'depth': depth
+    }
+
+def ensemble_margins(ensemble, X):
+    """
+    Raw per-class scores for a float32 (n, n_features) matrix, traversing
+    every tree for every row at once.
+    """
+    n, n_features = X.shape
+
+    # Missing values go to each split's default side: splits defaulting
+    # left read the first copy of X (NaN -> -inf), the others the second
+    # copy (NaN -> +inf)
+    X2 = np.empty((n, 2 * n_features), dtype=np.float32)
+    X2[:, :n_features] = X
+    X2[:, n_features:] = X
+    missing = np.isnan(X)
+    if missing.any():
+        X2[:, :n_features][missing] = -np.inf
+        X2[:, n_features:][missing] = np.inf
+
+    flat = X2.ravel()
+    row_offsets = (np.arange(n) * 2 * n_features)[:, None]
+
+    # The root level reads fixed slots, so its lookups are precomputed
+    go_right = flat[row_offsets + ensemble['root_feature']] >= ensemble['root_threshold']
+    node = ensemble['root_child_base'] + go_right
+    for _ in range(ensemble['depth'] - 1):
+        go_right = flat[row_offsets + ensemble['feature'][node]] >= ensemble['threshold'][node]
+        node = ensemble['child_base'][node] + go_right
+
+    leaf_values = ensemble['value'][node]
+    return np.add.reduceat(leaf_values, ensemble['class_starts'], axis=1) + ensemble['base_margin']
+
+def ensemble_predict_proba(ensemble, X):
+    """
+    Softmax class probabilities, as XGBClassifier.predict_proba.
+    """
+    margins = ensemble_margins(ensemble, X)
+    margins -= margins.max(axis=1, keepdims=True)
+    exp = np.exp(margins)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+class NumpyTreeModel:
+    """
+    Drop-in replacement for a fitted XGBClassifier's predict_proba that
+    evaluates the exported trees with NumPy, for low-latency small batches.
+    """
+    def __init__(self, model):
+        self.model = model
+        self.ensemble = export_booster(model)
+        self.feature_names = model.get_booster().feature_names
+
+    def predict_proba(self, X):
+        if isinstance(X, pd.DataFrame):
+            X = X[self.feature_names] if self.feature_names else X
+            X = X.to_numpy(dtype=np.float32)
+        X = np.asarray(X, dtype=np.float32)
+        if len(X) > MAX_NUMPY_ROWS:
+            return self.model.predict_proba(X)
+        return ensemble_predict_proba(self.ensemble, X)
@@ -1,41 +1,28 @@
+import argparse
 import pandas as pd
-import pickle
 import xgboost as xgb
 from sklearn.linear_model import LogisticRegression
-from sklearn.model_selection import GridSearchCV, TimeSeriesSplit
+from sklearn.model_selection import GridSearchCV, TimeSeriesSplit, ParameterSampler
 from sklearn.preprocessing import StandardScaler
-from src.config import FEATURES_TABLE, XGB_MODEL_PATH, BASELINE_MODEL_PATH, SCALER_PATH
-
-def tune_hyperparameters():
-    df = pd.read_csv(FEATURES_TABLE)
-    
-    # Define target
-    df['target'] = 1
-    df.loc[df['home_score'] > df['away_score'], 'target'] = 0
-    df.loc[df['home_score'] < df['away_score'], 'target'] = 2
-    
-    features = [
-        'home_rank', 'away_rank', 'home_points', 'away_points', 
-        'home_form', 'away_form', 'home_weighted_form', 'away_weighted_form',
-        'home_goal_diff_form', 'away_goal_diff_form',
-        'rank_diff', 'point_diff', 'home_rank_momentum', 'away_rank_momentum',
-        'h2h_win_rate', 'h2h_game_count', 'is_home_adv', 'is_neutral', 'tournament_weight',
-        'home_elo', 'away_elo', 'elo_diff', 'home_travel_dist', 'away_travel_dist'
-    ]
-    
-    df = df.dropna(subset=features)
-    
-    # Time-based split (train < 2024)
-    df['date'] = pd.to_datetime(df['date'])
-    train_df = df[df['date'].dt.year < 2024]
-    
-    X_train = train_df[features]
-    y_train = train_df['target']
-    
-    # Use TimeSeriesSplit for cross-validation
-    tscv = TimeSeriesSplit(n_splits=5)
-    
-    print("--- Tuning XGBoost ---")
+from src.config import REPORTS_DIR
+from src.features.schema import load_dataset, feature_frame
+from src.models.halving import successive_halving
+from src.models.registry import save_model
+
+# Search space of the successive-halving mode; the number of boosting
+# rounds is the budget, not a searched parameter
+XGB_SEARCH_SPACE = {
+    'max_depth': [2, 3, 4, 5, 6, 7],
+    'learning_rate': [0.01, 0.03, 0.1, 0.2],
+    'subsample': [0.6, 0.8, 1.0],
+    'colsample_bytree': [0.6, 0.8, 1.0],
+    'min_child_weight': [1, 5, 10],
+    'reg_lambda': [1, 5, 10]
+}
+
+TRIALS_LOG_PATH = REPORTS_DIR / "tuning_trials.csv"
+
+def grid_search_xgb(X_train, y_train, cv):
     xgb_model = xgb.XGBClassifier(random_state=42, use_label_encoder=False, eval_metric='mlogloss')
     xgb_param_grid = {
         'n_estimators': [50, 100, 200],
@@ -43,40 +30,91 @@ def tune_hyperparameters():
         'learning_rate': [0.01, 0.1, 0.2],
         'subsample': [0.8, 1.0]
     }
-    
-    xgb_grid = GridSearchCV(xgb_model, xgb_param_grid, cv=tscv, scoring='accuracy', n_jobs=-1)
+
+    xgb_grid = GridSearchCV(xgb_model, xgb_param_grid, cv=cv, scoring='accuracy', n_jobs=-1)
     xgb_grid.fit(X_train, y_train)
-    
+
     print(f"Best XGBoost Params: {xgb_grid.best_params_}")
     print(f"Best XGBoost Score: {xgb_grid.best_score_:.4f}")
-    
+    return xgb_grid.best_estimator_, xgb_grid.best_params_
+
+def halving_search_xgb(X_train, y_train, n_candidates=81, metric='mlogloss', max_workers=None, seed=42):
+    """
+    Tunes XGBoost by successive halving over n_candidates sampled from
+    XGB_SEARCH_SPACE, then refits the winner on the whole training split.
+    Every trial is printed and saved to TRIALS_LOG_PATH.
+    """
+    candidates = [
+        {name: (value.item() if hasattr(value, 'item') else value) for name, value in params.items()}
+        for params in ParameterSampler(XGB_SEARCH_SPACE, n_iter=n_candidates, random_state=seed)
+    ]
+    trials = []
+
+    def log(trial):
+        trials.append(trial)
+        print(f"rung {trial['rung']} candidate {trial['candidate']:>3}: {trial['rounds']:>4} rounds, "
+              f"{metric} {trial[metric]:.4f} ({trial['seconds']:.1f}s)")
+
+    best_params, rounds, best_score = successive_halving(candidates, metric=metric, max_workers=max_workers, log=log)
+    pd.DataFrame(trials).to_csv(TRIALS_LOG_PATH, index=False)
+    print(f"{len(trials)} trials logged to {TRIALS_LOG_PATH}")
+
+    best_params = {**best_params, 'n_estimators': rounds}
+    print(f"Best XGBoost Params: {best_params}")
+    print(f"Best XGBoost {metric}: {best_score:.4f}")
+
+    model = xgb.XGBClassifier(random_state=42, eval_metric='mlogloss', **best_params)
+    model.fit(X_train, y_train)
+    return model, best_params
+
+def tune_hyperparameters(mode='grid', n_candidates=81, metric='mlogloss', max_workers=None):
+    data = load_dataset()
+
+    # Time-based split (train < 2024). The memory-mapped slices are passed
+    # to GridSearchCV's workers by reference, not copied into each of them
+    X_train = feature_frame(data['X'][data['train']])
+    y_train = data['y'][data['train']]
+
+    # Use TimeSeriesSplit for cross-validation
+    tscv = TimeSeriesSplit(n_splits=5)
+
+    print("--- Tuning XGBoost ---")
+    if mode == 'halving':
+        best_xgb, xgb_best_params = halving_search_xgb(X_train, y_train, n_candidates, metric, max_workers)
+    else:
+        best_xgb, xgb_best_params = grid_search_xgb(X_train, y_train, tscv)
+
     # Save best XGBoost model
-    with open(XGB_MODEL_PATH, 'wb') as f:
-        pickle.dump(xgb_grid.best_estimator_, f)
-        
+    save_model('xgb', best_xgb)
+
     print("--- Tuning Logistic Regression ---")
     scaler = StandardScaler()
     X_train_scaled = scaler.fit_transform(X_train)
-    
+
     lr_model = LogisticRegression(multi_class='multinomial', max_iter=1000, random_state=42)
     lr_param_grid = {
         'C': [0.01, 0.1, 1, 10, 100],
         'solver': ['lbfgs', 'saga']
     }
-    
+
     lr_grid = GridSearchCV(lr_model, lr_param_grid, cv=tscv, scoring='accuracy', n_jobs=-1)
     lr_grid.fit(X_train_scaled, y_train)
-    
+
     print(f"Best Logistic Regression Params: {lr_grid.best_params_}")
     print(f"Best Logistic Regression Score: {lr_grid.best_score_:.4f}")
-    
+
     # Save best Logistic Regression model and scaler
-    with open(BASELINE_MODEL_PATH, 'wb') as f:
-        pickle.dump(lr_grid.best_estimator_, f)
-    with open(SCALER_PATH, 'wb') as f:
-        pickle.dump(scaler, f)
-        
-    return xgb_grid.best_params_, lr_grid.best_params_
+    save_model('baseline', lr_grid.best_estimator_)
+    save_model('scaler', scaler)
+
+    return xgb_best_params, lr_grid.best_params_
 
 if __name__ == "__main__":
-    tune_hyperparameters()
+    parser = argparse.ArgumentParser(description="Tune the XGBoost and logistic regression models.")
+    parser.add_argument('--mode', choices=['grid', 'halving'], default='grid',
+                        help="grid: exhaustive GridSearchCV; halving: successive halving over boosting rounds")
+    parser.add_argument('--candidates', type=int, default=81, help="Candidates sampled in halving mode")
+    parser.add_argument('--metric', choices=['mlogloss', 'rps'], default='mlogloss', help="Objective of halving mode")
+    parser.add_argument('--workers', type=int, default=None, help="Trial processes in halving mode")
+    args = parser.parse_args()
+    tune_hyperparameters(args.mode, args.candidates, args.metric, args.workers)
@@ -0,0 +1,135 @@
+import argparse
+import os
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from concurrent.futures import ProcessPoolExecutor
+from sklearn.metrics import log_loss
+from src.config import REPORTS_DIR
+from src.features.schema import load_dataset, MATCH_FEATURES
+from src.models.evaluate import calculate_rps
+from src.models.train import XGB_PARAMS
+
+WALK_FORWARD_PATH = REPORTS_DIR / "walk_forward_predictions.csv"
+
+def booster_params(params=XGB_PARAMS):
+    """
+    Native xgboost parameters equivalent to XGBClassifier keyword arguments;
+    n_estimators becomes the number of boosting rounds.
+    """
+    native = {name: value for name, value in params.items() if name not in ('n_estimators', 'random_state')}
+    return {'objective': 'multi:softprob', 'num_class': 3, 'seed': params.get('random_state', 0), **native}
+
+def step_edges(dates, start, end=None, freq='QS'):
+    """
+    Row index of the first match on or after each step boundary, from
+    `start` to `end` (default: past the last match) every `freq`, over
+    date-sorted matches.
+    """
+    end = pd.Timestamp(end) if end is not None else pd.Timestamp(dates[-1]) + pd.Timedelta(days=1)
+    boundaries = pd.date_range(start, end, freq=freq)
+    if len(boundaries) == 0 or boundaries[-1] < end:
+        boundaries = boundaries.append(pd.DatetimeIndex([end]))
+    return np.searchsorted(dates, boundaries.to_numpy().astype(dates.dtype)), boundaries
+
+def _dmatrix(X, y=None):
+    return xgb.DMatrix(X, label=y, feature_names=MATCH_FEATURES)
+
+def _run_chain(edges, params, initial_rounds, rounds_per_step):
+    """
+    Walks forward over consecutive steps: fits a booster on every match
+    before the first edge, then for each step predicts its matches and
+    continues training the same booster on them. Returns the out-of-sample
+    probabilities of the chain's matches, in order.
+    """
+    data = load_dataset()
+    X, y = data['X'], data['y']
+
+    booster = xgb.train(params, _dmatrix(X[:edges[0]], y[:edges[0]]), num_boost_round=initial_rounds)
+    probs = []
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        if hi == lo:
+            continue
+        window = _dmatrix(X[lo:hi], y[lo:hi])
+        probs.append(booster.predict(window))
+        # Warm start: add trees fitted on the newly available matches only
+        booster = xgb.train(params, window, num_boost_round=rounds_per_step, xgb_model=booster)
+    return np.vstack(probs) if probs else np.empty((0, 3))
+
+def walk_forward(start='2016-01-01', end=None, freq='QS', rounds_per_step=20, segment_years=2,
+                 params=XGB_PARAMS, max_workers=None):
+    """
+    Walk-forward backtest: steps through time every `freq` from `start`,
+    scoring each step's matches with a model trained only on earlier
+    matches, then warm-starting it on them. Every `segment_years` a new
+    chain is started with a full fit, so chains are independent and run in
+    parallel processes (segment_years=None walks one chain). Returns one
+    row per match with its out-of-sample probabilities.
+    """
+    data = load_dataset()
+    dates = data['dates']
+    edges, boundaries = step_edges(dates, start, end, freq)
+
+    # Split the steps into chains of segment_years each; a chain's last
+    # edge is the next chain's first
+    if segment_years:
+        years = boundaries[:-1].year - boundaries[0].year
+        firsts = np.flatnonzero(np.diff(years // segment_years, prepend=-1))
+        lasts = np.append(firsts[1:], len(years))
+        chains = [edges[a:b + 1] for a, b in zip(firsts, lasts)]
+    else:
+        chains = [edges]
+
+    native = booster_params(params)
+    with ProcessPoolExecutor(max_workers=min(max_workers or os.cpu_count(), len(chains))) as executor:
+        futures = [executor.submit(_run_chain, chain, native, params['n_estimators'], rounds_per_step) for chain in chains]
+        probs = np.vstack([future.result() for future in futures])
+
+    rows = slice(edges[0], edges[-1])
+    step = np.searchsorted(edges, np.arange(rows.start, rows.stop), side='right') - 1
+    return pd.DataFrame({
+        'date': dates[rows],
+        'step_start': boundaries[step],
+        'target': data['y'][rows],
+        'home_win_prob': probs[:, 0],
+        'draw_prob': probs[:, 1],
+        'away_win_prob': probs[:, 2]
+    })
+
+def summarize(predictions, by='year'):
+    """
+    Accuracy, log loss and RPS of walk-forward predictions per period.
+    """
+    period = predictions['date'].dt.year if by == 'year' else predictions['step_start']
+    rows = []
+    for key, group in predictions.groupby(period):
+        probs = group[['home_win_prob', 'draw_prob', 'away_win_prob']].to_numpy()
+        y = group['target'].to_numpy()
+        rows.append({
+            by: key,
+            'matches': len(group),
+            'accuracy': (probs.argmax(axis=1) == y).mean(),
+            'log_loss': log_loss(y, probs, labels=[0, 1, 2]),
+            'rps': calculate_rps(y, probs)
+        })
+    return pd.DataFrame(rows).set_index(by)
+
+def main():
+    parser = argparse.ArgumentParser(description="Walk-forward backtest with warm-start retraining.")
+    parser.add_argument('--start', default='2016-01-01', help="First step boundary")
+    parser.add_argument('--end', default=None, help="Last step boundary (default: after the last match)")
+    parser.add_argument('--freq', default='QS', help="Step length as a pandas frequency, e.g. QS, MS, YS")
+    parser.add_argument('--rounds-per-step', type=int, default=20, help="Boosting rounds added at each step")
+    parser.add_argument('--segment-years', type=int, default=2, help="Years per independent chain (0: one chain)")
+    parser.add_argument('--workers', type=int, default=None, help="Chain processes")
+    args = parser.parse_args()
+
+    predictions = walk_forward(args.start, args.end, args.freq, args.rounds_per_step, args.segment_years or None,
+                               max_workers=args.workers)
+    predictions.to_csv(WALK_FORWARD_PATH, index=False)
+
+    print(summarize(predictions).round(4))
+    print(f"\n{len(predictions)} out-of-sample predictions saved to {WALK_FORWARD_PATH}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import hashlib
+import json
+import inspect
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+
+def stage(name, func, inputs=(), outputs=(), params=None, code=()):
+    """
+    Declares a pipeline stage. `func` is called with `params` as keyword
+    arguments; `code` lists the modules and functions whose source defines
+    the stage.
+    """
+    return {
+        'name': name,
+        'func': func,
+        'inputs': [Path(p) for p in inputs],
+        'outputs': [Path(p) for p in outputs],
+        'params': params or {},
+        'code': list(code)
+    }
+
+def _file_hash(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def stage_key(st):
+    """
+    Hash of a stage's input files, parameters and code version.
+    """
+    h = hashlib.sha256()
+    for path in st['inputs']:
+        h.update(str(path.name).encode())
+        h.update(_file_hash(path).encode() if path.exists() else b'missing')
+    h.update(json.dumps(st['params'], sort_keys=True, default=str).encode())
+    for module in st['code']:
+        h.update(inspect.getsource(module).encode())
+    return h.hexdigest()
+
+def _dependencies(stages):
+    producers = {out: st['name'] for st in stages for out in st['outputs']}
+    return {
+        st['name']: {producers[p] for p in st['inputs'] if p in producers and producers[p] != st['name']}
+        for st in stages
+    }
+
+def _load_cache(cache_path):
+    if cache_path.exists():
+        with open(cache_path) as f:
+            return json.load(f)
+    return {}
+
+def _save_cache(cache, cache_path):
+    with open(cache_path, 'w') as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+
+def run_dag(stages, cache_path, force=False, only=None, max_workers=None):
+    """
+    Runs the stages in dependency order, executing independent stages
+    concurrently. A stage is skipped when its key matches the cached key
+    and its outputs exist, unless `force` is set. `only` restricts the run
+    to the named stages; their inputs must already exist.
+    """
+    by_name = {st['name']: st for st in stages}
+    if only:
+        unknown = set(only) - set(by_name)
+        if unknown:
+            raise ValueError(f"Unknown stage(s): {', '.join(sorted(unknown))}. Available: {', '.join(by_name)}")
+    selected = [st['name'] for st in stages if not only or st['name'] in only]
+
+    deps = _dependencies(stages)
+    cache = _load_cache(cache_path)
+    done = set(by_name) - set(selected)
+    executed = []
+
+    def ready(name):
+        return deps[name] <= done
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pending = list(selected)
+        running = {}
+
+        while pending or running:
+            # Skipped stages can unblock others, so schedule until nothing changes
+            scheduled = True
+            while scheduled:
+                scheduled = False
+                for name in [n for n in pending if ready(n)]:
+                    pending.remove(name)
+                    scheduled = True
+                    st = by_name[name]
+                    key = stage_key(st)
+                    outputs_exist = all(p.exists() for p in st['outputs'])
+
+                    if not force and cache.get(name) == key and outputs_exist:
+                        print(f"[skip] {name} (up to date)")
+                        done.add(name)
+                        continue
+
+                    print(f"[run]  {name}")
+                    running[pool.submit(st['func'], **st['params'])] = (name, key)
+
+            if not running:
+                if pending:
+                    raise RuntimeError(f"Stages with unresolved dependencies: {', '.join(pending)}")
+                break
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name, key = running.pop(future)
+                try:
+                    future.result()
+                except Exception:
+                    _save_cache(cache, cache_path)
+                    raise
+                cache[name] = key
+                done.add(name)
+                executed.append(name)
+
+            # Checkpoint after every completed stage
+            _save_cache(cache, cache_path)
+
+    return executed
@@ -1,129 +1,60 @@
 import streamlit as st
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath('.'))
+
 import pandas as pd
 import numpy as np
-import pickle
-import os
 import plotly.express as px
 from PIL import Image
+from src.config import TEAM_STORE_PATH, XGB_MODEL_PATH
+from src.features.team_store import load_team_store, get_team_state
+from src.models.matchups import build_matchup_matrix
+from src.models.registry import get_model
 
 # Paths
-MODEL_PATH = "models/xgb_v1.pkl"
-FEATURES_TABLE = "data/processed/features.csv"
 SHAP_PLOT_PATH = "outputs/figures/shap_summary.png"
 
 st.set_page_config(page_title="AFCON 2025 Predictor", layout="wide")
 
-@st.cache_resource
 def load_model():
-    if os.path.exists(MODEL_PATH):
-        with open(MODEL_PATH, 'rb') as f:
-            return pickle.load(f)
+    # The registry caches the model and reloads it after a retrain
+    if os.path.exists(XGB_MODEL_PATH):
+        return get_model('xgb', refresh=True)
     return None
 
 @st.cache_data
-def load_data():
-    if os.path.exists(FEATURES_TABLE):
-        df = pd.read_csv(FEATURES_TABLE)
-        df['date'] = pd.to_datetime(df['date'])
-        return df
+def load_store():
+    if os.path.exists(TEAM_STORE_PATH):
+        return load_team_store()
     return None
 
-def get_team_features(team_name, df):
-    team_df = df[(df['home_team'] == team_name) | (df['away_team'] == team_name)].sort_values('date', ascending=False)
-    if team_df.empty:
-        return None
-    
-    latest = team_df.iloc[0]
-    if latest['home_team'] == team_name:
-        return {
-            'rank': latest['home_rank'],
-            'points': latest['home_points'],
-            'form': latest['home_form'],
-            'weighted_form': latest['home_weighted_form'],
-            'goal_diff_form': latest['home_goal_diff_form'],
-            'rank_momentum': latest['home_rank_momentum'],
-            'elo': latest['home_elo'],
-            'travel_dist': latest['home_travel_dist'],
-            'squad_value': latest['home_squad_value'],
-            'squad_quality': latest['home_squad_quality'],
-            'log_value': latest['log_home_value']
-        }
-    else:
-        return {
-            'rank': latest['away_rank'],
-            'points': latest['away_points'],
-            'form': latest['away_form'],
-            'weighted_form': latest['away_weighted_form'],
-            'goal_diff_form': latest['away_goal_diff_form'],
-            'rank_momentum': latest['away_rank_momentum'],
-            'elo': latest['away_elo'],
-            'travel_dist': latest['away_travel_dist'],
-            'squad_value': latest['away_squad_value'],
-            'squad_quality': latest['away_squad_quality'],
-            'log_value': latest['log_away_value']
-        }
-
 def main():
     st.title("🏆 AFCON 2025 Predictor - Pro Dashboard")
     st.markdown("---")
 
     model = load_model()
-    df = load_data()
+    store = load_store()
 
-    if model is None or df is None:
+    if model is None or store is None:
         st.error("Model or data not found. Please run the training pipeline first.")
         return
 
     # Sidebar
     st.sidebar.header("Match Predictor")
-    all_teams = sorted(list(set(df['home_team'].unique()) | set(df['away_team'].unique())))
+    all_teams = sorted(store.index)
     
     home_team = st.sidebar.selectbox("Home Team", all_teams, index=all_teams.index("Morocco") if "Morocco" in all_teams else 0)
     away_team = st.sidebar.selectbox("Away Team", all_teams, index=all_teams.index("Senegal") if "Senegal" in all_teams else 1)
 
     if st.sidebar.button("Predict Match"):
-        h_feats = get_team_features(home_team, df)
-        a_feats = get_team_features(away_team, df)
+        h_feats = get_team_state(store, home_team)
+        a_feats = get_team_state(store, away_team)
         
         if h_feats and a_feats:
-            match_feats = {
-                'home_rank': h_feats['rank'],
-                'away_rank': a_feats['rank'],
-                'home_points': h_feats['points'],
-                'away_points': a_feats['points'],
-                'home_form': h_feats['form'],
-                'away_form': a_feats['form'],
-                'home_weighted_form': h_feats['weighted_form'],
-                'away_weighted_form': a_feats['weighted_form'],
-                'home_goal_diff_form': h_feats['goal_diff_form'],
-                'away_goal_diff_form': a_feats['goal_diff_form'],
-                'rank_diff': h_feats['rank'] - a_feats['rank'],
-                'point_diff': h_feats['points'] - a_feats['points'],
-                'home_rank_momentum': h_feats['rank_momentum'],
-                'away_rank_momentum': a_feats['rank_momentum'],
-                'h2h_win_rate': 0.5,
-                'h2h_game_count': 0,
-                'is_home_adv': 0,
-                'is_neutral': 1,
-                'tournament_weight': 8,
-                'home_elo': h_feats['elo'],
-                'away_elo': a_feats['elo'],
-                'elo_diff': h_feats['elo'] - a_feats['elo'],
-                'home_travel_dist': h_feats['travel_dist'],
-                'away_travel_dist': a_feats['travel_dist'],
-                'home_squad_value': h_feats['squad_value'],
-                'away_squad_value': a_feats['squad_value'],
-                'home_squad_quality': h_feats['squad_quality'],
-                'away_squad_quality': a_feats['squad_quality'],
-                'log_home_value': h_feats['log_value'],
-                'log_away_value': a_feats['log_value'],
-                'value_diff': h_feats['squad_value'] - a_feats['squad_value'],
-                'value_ratio': h_feats['squad_value'] / (a_feats['squad_value'] + 1e-6),
-                'quality_diff': h_feats['squad_quality'] - a_feats['squad_quality']
-            }
-            
-            X = pd.DataFrame([match_feats])
-            probs = model.predict_proba(X)[0]
+            probs = build_matchup_matrix([home_team, away_team], model, store)[0, 1]
             
             col1, col2, col3 = st.columns(3)
             col1.metric(f"{home_team} Win", f"{probs[0]*100:.1f}%")
@@ -177,8 +108,8 @@ def main():
         t1 = st.selectbox("Select Team 1", all_teams, index=0)
         t2 = st.selectbox("Select Team 2", all_teams, index=1)
         
-        f1 = get_team_features(t1, df)
-        f2 = get_team_features(t2, df)
+        f1 = get_team_state(store, t1)
+        f2 = get_team_state(store, t2)
         
         if f1 and f2:
             comp_df = pd.DataFrame([f1, f2], index=[t1, t2]).T
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from src.models.bracket import exact_bracket, simulate_bracket, stage_names
+
+N_TEAMS = 16
+
+@pytest.fixture(scope="module")
+def probs():
+    # Random matchup tensor with a NaN diagonal, as build_matchup_matrix returns
+    rng = np.random.default_rng(0)
+    probs = rng.dirichlet([2.0, 1.0, 2.0], size=(N_TEAMS, N_TEAMS))
+    probs[np.arange(N_TEAMS), np.arange(N_TEAMS)] = np.nan
+    return probs
+
+def test_simulated_counts_are_consistent(probs):
+    n_simulations = 1000
+    counts = simulate_bracket(probs, np.arange(N_TEAMS), n_simulations, np.random.default_rng(1))
+    assert counts.shape == (len(stage_names(N_TEAMS)), N_TEAMS)
+    # Every round has half as many winners as the one before
+    for r, round_counts in enumerate(counts):
+        assert round_counts.sum() == n_simulations * N_TEAMS // 2 ** (r + 1)
+    # Reaching a stage requires winning every earlier round
+    assert (np.diff(counts, axis=0) <= 0).all()
+
+def test_simulation_is_reproducible(probs):
+    first = simulate_bracket(probs, np.arange(N_TEAMS), 5000, np.random.default_rng(7))
+    second = simulate_bracket(probs, np.arange(N_TEAMS), 5000, np.random.default_rng(7))
+    np.testing.assert_array_equal(first, second)
+
+@pytest.mark.parametrize("draw_home_share", [0.5, 0.7])
+def test_exact_matches_simulation(probs, draw_home_share):
+    slots = np.random.default_rng(2).permutation(N_TEAMS)
+    n_simulations = 400_000
+    exact = exact_bracket(probs, slots, draw_home_share)
+    simulated = simulate_bracket(probs, slots, n_simulations, np.random.default_rng(3), draw_home_share) / n_simulations
+
+    # Exact probabilities sum to the number of winners per round
+    np.testing.assert_allclose(exact.sum(axis=1), [N_TEAMS / 2 ** (r + 1) for r in range(len(exact))])
+    # Within 5 standard errors of a proportion near 0.5
+    assert np.abs(exact - simulated).max() < 5 * 0.5 / np.sqrt(n_simulations)
+
+def test_exact_with_certain_outcomes():
+    # The lower index always wins: team 0 wins the bracket, and each team's
+    # last round is the one where it meets a lower index
+    winner = np.tril(np.ones((N_TEAMS, N_TEAMS)), -1).T
+    probs = np.stack([winner, np.zeros_like(winner), 1 - winner], axis=-1)
+    exact = exact_bracket(probs, np.arange(N_TEAMS))
+    assert exact[-1, 0] == 1.0
+    np.testing.assert_array_equal(exact[0], np.arange(N_TEAMS) % 2 == 0)
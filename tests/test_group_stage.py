@@ -0,0 +1,84 @@
+from itertools import combinations
+import numpy as np
+import pytest
+from src.models.group_stage import (
+    AFCON_2025_GROUPS, R16_LAYOUT, THIRD_PLACE_TABLE,
+    group_fixtures, group_tables, head_to_head, r16_slots, rank_groups
+)
+
+GROUP_NAMES = list(AFCON_2025_GROUPS)
+
+def test_third_place_table_covers_every_combination():
+    assert sorted(THIRD_PLACE_TABLE) == [''.join(c) for c in combinations(GROUP_NAMES, 4)]
+    for qualified, opponents in THIRD_PLACE_TABLE.items():
+        # Each qualified third-placed team is drawn once
+        assert sorted(opponents) == sorted(qualified)
+        # and never against the winner of its own group
+        assert all(third != winner for third, winner in zip(opponents, 'ABCD'))
+
+def test_r16_layout():
+    places = R16_LAYOUT
+    assert len(set(places)) == 16
+    assert {g for p, g in places if p == '1'} == set(GROUP_NAMES)
+    assert {g for p, g in places if p == '2'} == set(GROUP_NAMES)
+    assert {g for p, g in places if p == '3'} == set('ABCD')
+    # Third-placed teams meet the winners they are keyed by
+    for s in range(0, 16, 2):
+        pair = {R16_LAYOUT[s], R16_LAYOUT[s + 1]}
+        thirds = [group for place, group in pair if place == '3']
+        if thirds:
+            assert ('1', thirds[0]) in pair
+
+@pytest.fixture(scope="module")
+def sampled_groups():
+    rng = np.random.default_rng(0)
+    size = 2000
+    home_idx, away_idx = group_fixtures(AFCON_2025_GROUPS)
+    home_goals = rng.poisson(1.2, (size, len(home_idx)))
+    away_goals = rng.poisson(1.0, (size, len(home_idx)))
+    points, goal_diff, goals_for = group_tables(home_goals, away_goals, home_idx, away_idx, 24)
+    h2h = head_to_head(points, home_goals, away_goals, home_idx, away_idx)
+    placed = rank_groups(points, goal_diff, goals_for, rng, h2h)
+    return placed, points, goal_diff, goals_for, rng
+
+def test_rank_groups_orders_by_points(sampled_groups):
+    placed, points, _, _, _ = sampled_groups
+    runs = np.arange(len(placed))[:, None, None]
+    assert (np.diff(points[runs, placed], axis=-1) <= 0).all()
+    # Every team is placed exactly once in its own group
+    expected = np.arange(24).reshape(6, 4)
+    np.testing.assert_array_equal(np.sort(placed, axis=-1), np.broadcast_to(expected, placed.shape))
+
+def test_r16_slots_hold_the_qualifiers(sampled_groups):
+    placed, points, goal_diff, goals_for, rng = sampled_groups
+    slots = r16_slots(placed, points, goal_diff, goals_for, rng, GROUP_NAMES)
+    thirds = placed[:, :, 2]
+
+    for k in range(len(placed)):
+        qualifiers = set(placed[k, :, :2].ravel())
+        assert qualifiers < set(slots[k])
+        assert len(set(slots[k])) == 16
+
+        # The four thirds are the best by points, goal difference and goals
+        stats = [(points[k, t], goal_diff[k, t], goals_for[k, t]) for t in thirds[k]]
+        chosen = {t // 4 for t in set(slots[k]) - qualifiers}
+        assert min(stats[g] for g in chosen) >= max(stats[g] for g in range(6) if g not in chosen)
+
+        # Every third-placed team slots in against a winner from another group
+        for s, (place, group) in enumerate(R16_LAYOUT):
+            if place == '3':
+                assert slots[k, s] // 4 != GROUP_NAMES.index(group)
+
+def test_head_to_head_breaks_level_points():
+    groups = {'A': ['a', 'b', 'c', 'd']}
+    home_idx, away_idx = group_fixtures(groups)
+    # a-b 1-0, c-d 0-1, a-c 0-0, b-d 5-0, a-d 0-0, b-c 0-1: c and d are level
+    # on 4 points, c has the better goal difference but d won their match
+    home_goals = np.array([[1, 0, 0, 5, 0, 0]])
+    away_goals = np.array([[0, 1, 0, 0, 0, 1]])
+    points, goal_diff, goals_for = group_tables(home_goals, away_goals, home_idx, away_idx, 4)
+    rng = np.random.default_rng(0)
+
+    assert rank_groups(points, goal_diff, goals_for, rng)[0, 0].tolist() == [0, 2, 3, 1]
+    h2h = head_to_head(points, home_goals, away_goals, home_idx, away_idx)
+    assert rank_groups(points, goal_diff, goals_for, rng, h2h)[0, 0].tolist() == [0, 3, 2, 1]
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+from xgboost import XGBClassifier
+from src.config import XGB_MODEL_PATH
+from src.features.schema import MATCH_FEATURES, feature_frame
+from src.models.tree_backend import MAX_NUMPY_ROWS, NumpyTreeModel, ensemble_predict_proba, export_booster
+
+# Largest difference to xgboost's probabilities the NumPy backend may show
+TOLERANCE = 1e-6
+
+def _with_missing(X, rng, share=0.15):
+    X = X.copy()
+    X[rng.random(X.shape) < share] = np.nan
+    X[0] = np.nan
+    return X
+
+@pytest.fixture(scope="module")
+def synthetic():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(2000, len(MATCH_FEATURES))).astype(np.float32)
+    y = np.digitize(X[:, 0] + 0.5 * X[:, 1] + rng.normal(scale=0.5, size=len(X)), [-0.5, 0.5])
+    X = _with_missing(X, rng)
+    model = XGBClassifier(n_estimators=60, max_depth=5, learning_rate=0.1, random_state=0)
+    model.fit(feature_frame(X), y)
+    return model, X
+
+def test_ensemble_matches_xgboost(synthetic):
+    model, X = synthetic
+    expected = model.predict_proba(feature_frame(X))
+    np.testing.assert_allclose(ensemble_predict_proba(export_booster(model), X), expected, rtol=0, atol=TOLERANCE)
+
+def test_small_batches_use_numpy_and_match(synthetic):
+    model, X = synthetic
+    numpy_model = NumpyTreeModel(model)
+    for rows in [X[:1], X[1:2], X[:MAX_NUMPY_ROWS]]:
+        expected = model.predict_proba(feature_frame(rows))
+        np.testing.assert_allclose(numpy_model.predict_proba(rows), expected, rtol=0, atol=TOLERANCE)
+        np.testing.assert_allclose(numpy_model.predict_proba(feature_frame(rows)), expected, rtol=0, atol=TOLERANCE)
+
+@pytest.mark.skipif(not XGB_MODEL_PATH.exists(), reason="no trained model")
+def test_trained_model_matches_xgboost():
+    from src.models.registry import get_model
+    model = get_model('xgb')
+    rng = np.random.default_rng(1)
+    X = _with_missing(rng.normal(size=(500, len(MATCH_FEATURES))).astype(np.float32) * 100, rng)
+    expected = model.predict_proba(feature_frame(X))
+    np.testing.assert_allclose(ensemble_predict_proba(export_booster(model), X), expected, rtol=0, atol=TOLERANCE)